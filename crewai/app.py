@@ -6,16 +6,27 @@ import os
 from routes.scheduling import scheduling_bp
 from routes.audit import audit_bp
 from routes.ai import ai_bp
+from routes.recall import recall_bp
+from routes.replies import replies_bp
+from routes.phi import phi_bp
+from services.compression import init_compression
+from services.json_provider import FastJSONProvider
 
 load_dotenv()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev')
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+app.json = FastJSONProvider(app)
+init_compression(app)
 
 
 app.register_blueprint(scheduling_bp)
 app.register_blueprint(audit_bp)
 app.register_blueprint(ai_bp)
+app.register_blueprint(recall_bp)
+app.register_blueprint(replies_bp)
+app.register_blueprint(phi_bp)
 
 @app.route('/')
 def index():
@@ -0,0 +1,73 @@
+"""
+Benchmark JSON serialization and response compression for large payloads.
+
+    python -m benchmarks.json_payloads --rows 10000
+
+Compares Flask's standard-library JSON provider with FastJSONProvider on a
+/schedule-style listing, then reports bytes on the wire and compression time
+for each encoding the app can negotiate.
+"""
+import argparse
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from services.compression import available_encodings, compress_body
+from services.json_provider import FastJSONProvider, orjson
+
+
+def appointments_payload(rows):
+    return {'appointments': [
+        {
+            'id': i + 1,
+            'patient_name': f"Patient {i}",
+            'patient_id': f"PAT-2025-{i:05d}",
+            'patient_phone': f"+1512555{i % 10000:04d}",
+            'practice_id': f"practice-{i % 40}",
+            'date': f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            'time': f"{8 + i % 10:02d}:00",
+            'notes': 'Six-month hygiene recall',
+            'status': 'SCHEDULED',
+        }
+        for i in range(rows)
+    ]}
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    payload = appointments_payload(args.rows)
+    providers = [('stdlib', DefaultJSONProvider(app)), ('fast', FastJSONProvider(app))]
+
+    print(f"Rows: {args.rows:,}  (orjson {'available' if orjson else 'not installed, fast = stdlib'})")
+    print(f"{'provider':<10}{'serialize ms':>14}{'bytes':>12}")
+    body = None
+    with app.app_context():
+        for name, provider in providers:
+            response, seconds = best_of(lambda: provider.response(payload), args.repeat)
+            body = response.get_data()
+            print(f"{name:<10}{seconds * 1000:>14.2f}{len(body):>12,}")
+
+    print(f"\n{'encoding':<10}{'compress ms':>14}{'bytes':>12}{'ratio':>8}")
+    print(f"{'identity':<10}{0:>14.2f}{len(body):>12,}{1:>8.1f}")
+    for encoding in available_encodings():
+        compressed, seconds = best_of(lambda: compress_body(body, encoding), args.repeat)
+        print(f"{encoding:<10}{seconds * 1000:>14.2f}{len(compressed):>12,}{len(body) / len(compressed):>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark PHI masking throughput against roster size.
+
+    python -m benchmarks.phi_masking --rosters 1000 10000 50000 --messages 20000
+
+For each roster size, reports automaton build time, the cost of an incremental
+roster update, and batch masking throughput. The naive approach (one compiled
+regex per name) is measured on a sample of messages for comparison.
+"""
+import argparse
+import random
+import re
+import time
+
+from services.phi_masking import PHIMasker
+
+FIRST_NAMES = ['John', 'Jane', 'Maria', 'Wei', 'Aisha', 'Carlos', 'Priya', 'Liam', 'Olivia', 'Noah',
+               'Emma', 'Mateo', 'Yuki', 'Fatima', 'Ivan', 'Chloe', 'Omar', 'Grace', 'Diego', 'Sofia']
+TEMPLATES = [
+    "Hi {patient}! Reminder: You have an appointment at Smile Dental on 2025-11-20 at 10:00 AM.",
+    "Hi! Your appointment with {provider} is tomorrow at 2:00 PM. Reply CONFIRM or visit [RESCHEDULE_LINK]",
+    "Hi! Reminder: You have an appointment at [PRACTICE_NAME] on [DATE] at [TIME].",
+    "{patient}, {provider} has asked us to move your cleaning. Please call the office.",
+]
+
+
+def synthetic_roster(n, rng):
+    return [(f"PAT-{i:06d}", f"{rng.choice(FIRST_NAMES)} Doe{i}") for i in range(n)]
+
+
+def synthetic_messages(n, patients, providers, rng):
+    return [
+        rng.choice(TEMPLATES).format(patient=rng.choice(patients)[1], provider=f"Dr. {rng.choice(providers)}")
+        for _ in range(n)
+    ]
+
+
+def naive_mask(message, patterns):
+    for pattern, token in patterns:
+        message = pattern.sub(token, message)
+    return message
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rosters', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--naive-sample', type=int, default=200, help='Messages masked with per-name regexes')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    providers = [f"Smith{i}" for i in range(50)]
+    print(f"{'roster':>8}{'build s':>10}{'update ms':>11}{'msgs/s':>12}{'naive msgs/s':>14}")
+    for size in args.rosters:
+        patients = synthetic_roster(size, rng)
+        messages = synthetic_messages(args.messages, patients, providers, rng)
+
+        masker = PHIMasker()
+        start = time.perf_counter()
+        for patient_id, name in patients:
+            masker.add_patient(patient_id, name)
+        for i, name in enumerate(providers):
+            masker.add_provider(f"PROV-{i}", f"Dr. {name}")
+        masker.mask('')  # links the automaton
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        masker.add_patient('PAT-NEW', 'Newly Added Patient')
+        masker.remove(('patient', patients[0][0]))
+        masker.mask('')
+        update_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        masked = masker.mask_batch(messages)
+        mask_rate = len(messages) / (time.perf_counter() - start)
+
+        patterns = [(re.compile(rf"\b{re.escape(name)}\b", re.IGNORECASE), '[PATIENT]') for _, name in patients]
+        patterns += [(re.compile(rf"\bDr\.? {re.escape(name)}\b", re.IGNORECASE), '[PROVIDER]') for name in providers]
+        sample = messages[:args.naive_sample]
+        start = time.perf_counter()
+        naive = [naive_mask(message, patterns) for message in sample]
+        naive_rate = len(sample) / (time.perf_counter() - start)
+
+        assert naive == masked[:len(sample)], "automaton and naive masking disagree"
+        print(f"{size:>8,}{build_s:>10.2f}{update_ms:>11.1f}{mask_rate:>12,.0f}{naive_rate:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Durable per-appointment, per-task checkpoints for crew runs.
+
+Each completed task output is written to a local SQLite database keyed by
+appointment_id, a hash of the run inputs and the task name. Rerunning the same
+appointment with the same inputs skips the tasks that already completed and
+restarts from the first incomplete one. Starting a run with new inputs for an
+appointment supersedes its older runs, which are no longer resumed.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+DEFAULT_DB_PATH = 'checkpoints.db'
+
+# Every shard worker writes to the same database; wait this long for its lock
+BUSY_TIMEOUT_S = 30.0
+
+# Inputs that change on every invocation and must not affect resumption
+VOLATILE_INPUTS = ('current_datetime',)
+
+# Fields of crewai's TaskOutput that are persisted and restored
+TASK_OUTPUT_FIELDS = ('description', 'name', 'expected_output', 'summary', 'raw', 'json_dict', 'agent', 'output_format')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    appointment_id TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    completed_at TEXT,
+    PRIMARY KEY (appointment_id, input_hash)
+);
+CREATE TABLE IF NOT EXISTS task_checkpoints (
+    appointment_id TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    task_name TEXT NOT NULL,
+    output TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (appointment_id, input_hash, task_name)
+);
+"""
+
+
+def hash_inputs(inputs):
+    """Stable hash of the run inputs, ignoring volatile fields like current_datetime."""
+    stable = {k: v for k, v in inputs.items() if k not in VOLATILE_INPUTS}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class CheckpointStore:
+    """SQLite-backed checkpoint store. Path defaults to $CHECKPOINT_DB or ./checkpoints.db.
+
+    The database runs in WAL mode, so readers never block the shard workers'
+    writes, and writers queue for up to BUSY_TIMEOUT_S instead of failing with
+    "database is locked".
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('CHECKPOINT_DB', DEFAULT_DB_PATH)
+        self._conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def start_run(self, appointment_id, input_hash, inputs):
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (appointment_id, input_hash, inputs, started_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (appointment_id, input_hash) DO UPDATE SET started_at = excluded.started_at",
+                (appointment_id, input_hash, json.dumps(inputs, default=str), datetime.now().isoformat()),
+            )
+
+    def save_task(self, appointment_id, input_hash, task_name, output):
+        """Persist one completed task output (a dict of TASK_OUTPUT_FIELDS)."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_checkpoints VALUES (?, ?, ?, ?, ?)",
+                (appointment_id, input_hash, task_name, json.dumps(output, default=str), datetime.now().isoformat()),
+            )
+
+    def completed_tasks(self, appointment_id, input_hash):
+        """Map of task name -> saved output for a run."""
+        rows = self._conn.execute(
+            "SELECT task_name, output FROM task_checkpoints WHERE appointment_id = ? AND input_hash = ?",
+            (appointment_id, input_hash),
+        )
+        return {name: json.loads(output) for name, output in rows}
+
+    def finish_run(self, appointment_id, input_hash):
+        with self._conn:
+            self._conn.execute(
+                "UPDATE runs SET completed_at = ? WHERE appointment_id = ? AND input_hash = ?",
+                (datetime.now().isoformat(), appointment_id, input_hash),
+            )
+
+    def incomplete_runs(self):
+        """Latest run per appointment if it never finished, with the tasks it did complete."""
+        rows = self._conn.execute(
+            "SELECT r.appointment_id, r.input_hash, r.inputs, r.started_at, GROUP_CONCAT(t.task_name) "
+            "FROM runs r LEFT JOIN task_checkpoints t "
+            "ON t.appointment_id = r.appointment_id AND t.input_hash = r.input_hash "
+            "WHERE r.completed_at IS NULL AND r.started_at = "
+            "(SELECT MAX(started_at) FROM runs WHERE appointment_id = r.appointment_id) "
+            "GROUP BY r.appointment_id, r.input_hash ORDER BY r.started_at"
+        )
+        return [
+            {
+                'appointment_id': appointment_id,
+                'input_hash': input_hash,
+                'inputs': json.loads(inputs),
+                'started_at': started_at,
+                'completed_tasks': completed.split(',') if completed else [],
+            }
+            for appointment_id, input_hash, inputs, started_at, completed in rows
+        ]
@@ -1,11 +1,41 @@
-from crewai import Agent, Crew, Process, Task
+import json
+import re
+
+from crewai import Agent, Crew, CrewOutput, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
+from crewai.tasks.task_output import TaskOutput
+from typing import List, Optional, Tuple
+
+from dental_recall_crew.checkpoints import CheckpointStore, TASK_OUTPUT_FIELDS, hash_inputs
+from dental_recall_crew.fallback import deterministic_reminder_report
+from dental_recall_crew.llm_governor import get_governor
+
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
 
+REPLY_INTENTS = ('STOP', 'CANCEL', 'RESCHEDULE', 'CONFIRM')
+
+CLASSIFY_REPLY_DESCRIPTION = """A patient replied to an appointment reminder with the WhatsApp message below.
+Decide what the patient wants: STOP (no more messages), CANCEL (cancel the appointment),
+RESCHEDULE (move it to another day or time) or CONFIRM (will attend as booked).
+Questions, mixed messages and anything you are not sure about are UNKNOWN.
+
+Reply: {reply}"""
+
+
+def _approx_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def parse_reply_intent(raw: str) -> Optional[str]:
+    """First intent named in the agent's answer, or None for UNKNOWN / no intent."""
+    match = re.search(r"\b(STOP|CANCEL|RESCHEDULE|CONFIRM|UNKNOWN)\b", raw or '', re.IGNORECASE)
+    intent = match.group(1).upper() if match else None
+    return intent if intent in REPLY_INTENTS else None
+
+
 @CrewBase
 class DentalRecallCrew():
     """DentalRecallCrew - HIPAA-compliant dental appointment reminder system"""
@@ -23,21 +53,24 @@ class DentalRecallCrew():
     def hipaa_compliance_officer(self) -> Agent:
         return Agent(
             config=self.agents_config['hipaa_compliance_officer'], # type: ignore[index]
-            verbose=True
+            verbose=True,
+            max_retry_limit=0, # the LLM governor handles throttling and retries
         )
 
     @agent
     def dental_scheduler(self) -> Agent:
         return Agent(
             config=self.agents_config['dental_scheduler'], # type: ignore[index]
-            verbose=True
+            verbose=True,
+            max_retry_limit=0, # the LLM governor handles throttling and retries
         )
 
     @agent
     def reminder_coordinator(self) -> Agent:
         return Agent(
             config=self.agents_config['reminder_coordinator'], # type: ignore[index]
-            verbose=True
+            verbose=True,
+            max_retry_limit=0, # the LLM governor handles throttling and retries
         )
 
     # To learn more about structured task outputs,
@@ -75,3 +108,117 @@ class DentalRecallCrew():
             verbose=True,
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
+
+    def llm_budget(self, inputs: dict, completed=()) -> Tuple[int, int]:
+        """Estimated (provider requests, tokens) for the tasks of a run not yet in ``completed``.
+
+        One request per remaining task. Tokens are the prompt (agent personas,
+        task text, the inputs interpolated into every task and upstream task
+        outputs passed as context) plus the remaining tasks' agents' max_tokens
+        of output, at roughly four characters per token. Extra agent iterations
+        and retries are not known up front, so this is a lower bound.
+        """
+        agents = self.agents_config.values() # type: ignore[union-attr]
+        tasks = [cfg for name, cfg in self.tasks_config.items() if name not in completed] # type: ignore[union-attr]
+        max_tokens = {cfg.get('role'): int(cfg.get('max_tokens', 0)) for cfg in agents}
+
+        def task_output(cfg):
+            # CrewBase replaces the agent name in tasks_config with the Agent itself
+            agent = cfg.get('agent')
+            if isinstance(agent, str):
+                return int(self.agents_config.get(agent, {}).get('max_tokens', 0)) # type: ignore[union-attr]
+            return max_tokens.get(getattr(agent, 'role', None), 0)
+
+        output = sum(task_output(cfg) for cfg in tasks)
+        prompt = sum(_approx_tokens(f"{cfg.get('role', '')} {cfg.get('goal', '')} {cfg.get('backstory', '')}") for cfg in agents)
+        prompt += sum(_approx_tokens(f"{cfg.get('description', '')} {cfg.get('expected_output', '')}") for cfg in tasks)
+        prompt += len(tasks) * _approx_tokens(json.dumps(inputs, default=str))
+        prompt += sum(max_tokens.values())  # upstream outputs come back as context
+        return len(tasks), prompt + output
+
+    def resumable_kickoff(self, inputs: dict, store: Optional[CheckpointStore] = None):
+        """Kick off the crew, checkpointing each task and skipping tasks already completed.
+
+        Checkpoints are keyed by appointment_id and a hash of the inputs, so a
+        rerun of a failed appointment restarts from its first incomplete task
+        and reuses the saved outputs as context for the remaining ones.
+        """
+        owns_store = store is None
+        if owns_store:
+            store = CheckpointStore()
+        try:
+            appointment_id = inputs.get('appointment_id', '')
+            input_hash = hash_inputs(inputs)
+            store.start_run(appointment_id, input_hash, inputs)
+            completed = store.completed_tasks(appointment_id, input_hash)
+
+            self.crew()  # instantiates self.agents and self.tasks
+            remaining = []
+            for t in self.tasks:
+                if t.name in completed:
+                    t.output = TaskOutput(**completed[t.name])
+                else:
+                    remaining.append(t)
+
+            if not remaining:
+                result = CrewOutput(raw=self.tasks[-1].output.raw, tasks_output=[t.output for t in self.tasks])
+            else:
+                def checkpoint(output: TaskOutput):
+                    store.save_task(appointment_id, input_hash, output.name,
+                                    output.model_dump(include=set(TASK_OUTPUT_FIELDS), mode='json'))
+
+                result = Crew(
+                    agents=self.agents,
+                    tasks=remaining,
+                    process=Process.sequential,
+                    verbose=True,
+                    task_callback=checkpoint,
+                ).kickoff(inputs=inputs)
+            store.finish_run(appointment_id, input_hash)
+            return result
+        finally:
+            if owns_store:
+                store.close()
+
+    def classify_reply(self, text: str) -> Optional[str]:
+        """Ask the Dental Scheduler what a free-text patient reply means.
+
+        One governed provider request; returns one of REPLY_INTENTS, or None
+        when the agent is unsure, the provider throttles or the breaker is open.
+        """
+        scheduler = self.dental_scheduler()
+        task = Task(
+            description=CLASSIFY_REPLY_DESCRIPTION,
+            expected_output='One word: STOP, CANCEL, RESCHEDULE, CONFIRM or UNKNOWN',
+            agent=scheduler,
+        )
+        cfg = self.agents_config['dental_scheduler'] # type: ignore[index]
+        prompt = f"{cfg.get('role', '')} {cfg.get('goal', '')} {cfg.get('backstory', '')} {CLASSIFY_REPLY_DESCRIPTION} {text}"
+        return get_governor().call(
+            lambda: parse_reply_intent(
+                Crew(agents=[scheduler], tasks=[task], process=Process.sequential).kickoff(inputs={'reply': text}).raw
+            ),
+            tokens=_approx_tokens(prompt) + int(cfg.get('max_tokens', 0)),
+            requests=1,
+            fallback=lambda: None,
+        )
+
+    def governed_kickoff(self, inputs: dict):
+        """Kick off the crew through the shared LLM governor.
+
+        Only tasks without a checkpoint are charged against the rate limits.
+        Falls back to the deterministic compliance checks while the circuit
+        breaker is open or when the provider throttles the run.
+        """
+        store = CheckpointStore()
+        try:
+            completed = store.completed_tasks(inputs.get('appointment_id', ''), hash_inputs(inputs))
+            requests, tokens = self.llm_budget(inputs, completed)
+            return get_governor().call(
+                lambda: self.resumable_kickoff(inputs, store),
+                tokens=tokens,
+                requests=requests,
+                fallback=lambda: deterministic_reminder_report(inputs),
+            )
+        finally:
+            store.close()
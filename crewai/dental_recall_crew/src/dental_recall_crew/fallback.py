@@ -0,0 +1,54 @@
+"""
+Deterministic reminder path used when the LLM is unavailable.
+
+Applies the rule-based parts of validate_message_task (PHI patterns and
+business hours) without calling the provider. Messages are never sent from
+here: anything that passes is reported as DEFERRED so it is retried once the
+governor's circuit closes again.
+"""
+import re
+from datetime import datetime
+
+PHI_PATTERNS = {
+    'phone_number': re.compile(r'\(?\b\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b'),
+    'email_address': re.compile(r'\b[\w.+-]+@[\w-]+\.[\w.-]+\b'),
+    'ssn': re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
+}
+
+BUSINESS_HOURS = (8, 18)
+
+
+def check_compliance(inputs):
+    """Return the list of rule-based HIPAA violations for a reminder."""
+    violations = []
+    message = inputs.get('message_content', '')
+    for name, pattern in PHI_PATTERNS.items():
+        if pattern.search(message):
+            violations.append(f"Unmasked PHI: {name}")
+
+    delivery_time = inputs.get('delivery_time', '')
+    try:
+        hour = datetime.fromisoformat(delivery_time).hour
+    except (TypeError, ValueError):
+        violations.append("Invalid delivery_time")
+    else:
+        if not BUSINESS_HOURS[0] <= hour < BUSINESS_HOURS[1]:
+            violations.append("Delivery outside business hours (8am-6pm)")
+    return violations
+
+
+def deterministic_reminder_report(inputs):
+    """Build a reminder report without the LLM, mirroring the task output fields."""
+    violations = check_compliance(inputs)
+    return {
+        'appointment_id': inputs.get('appointment_id', ''),
+        'compliance_status': 'BLOCKED' if violations else 'APPROVED',
+        'violations': violations,
+        'message_status': 'BLOCKED' if violations else 'DEFERRED',
+        'reason': 'LLM unavailable; deterministic checks only',
+        'audit_log_entry': {
+            'timestamp': datetime.now().isoformat(),
+            'patient_id': inputs.get('patient_id', ''),
+            'action': 'fallback',
+        },
+    }
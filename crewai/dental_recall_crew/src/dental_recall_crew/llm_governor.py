@@ -0,0 +1,259 @@
+"""
+Shared governor for LLM provider calls.
+
+Every crew run goes through one LLMGovernor so that batch volume cannot push
+the provider into 429s. The governor combines:
+
+- token buckets for requests-per-minute and tokens-per-minute,
+- AIMD adaptive concurrency (grow by ~1 per round of successes, halve on throttling),
+- a circuit breaker that routes calls to a deterministic fallback while open,
+- queue-time and outcome metrics.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the circuit breaker is open and no fallback was given."""
+
+
+def is_throttle_error(exc):
+    """True for provider rate-limit and timeout errors."""
+    if isinstance(exc, TimeoutError):
+        return True
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'status', None)
+    if status in (429, 503, 504):
+        return True
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(marker in text for marker in ('429', 'rate limit', 'ratelimit', 'resource_exhausted', 'timeout', 'timed out'))
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` tokens/minute."""
+
+    def __init__(self, per_minute, capacity=None, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, per_minute, capacity=None):
+        """Change the refill rate (and capacity) in place, keeping the tokens already earned."""
+        with self._cond:
+            self._refill()
+            self.rate = per_minute / 60.0
+            self.capacity = float(capacity if capacity is not None else per_minute)
+            self.tokens = min(self.tokens, self.capacity)
+            self._cond.notify_all()
+
+    def acquire(self, amount=1.0):
+        """Block until `amount` tokens are available, then take them."""
+        amount = min(float(amount), self.capacity)
+        with self._cond:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                self._cond.wait((amount - self.tokens) / self.rate)
+
+
+class AIMDLimiter:
+    """Concurrency limit with additive increase / multiplicative decrease."""
+
+    def __init__(self, initial=4, minimum=1, maximum=32, backoff=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled=False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; probes again after `reset_timeout`."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._clock = clock
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                # Let exactly one probe through
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+                self._probing = False
+
+
+class LLMGovernor:
+    """Gate for LLM-backed calls: rate limits, adaptive concurrency and a circuit breaker."""
+
+    def __init__(self, requests_per_minute=60, tokens_per_minute=100_000,
+                 initial_concurrency=4, max_concurrency=32,
+                 failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.request_bucket = TokenBucket(requests_per_minute, clock=clock)
+        self.token_bucket = TokenBucket(tokens_per_minute, clock=clock)
+        self.limiter = AIMDLimiter(initial=initial_concurrency, maximum=max_concurrency)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, clock=clock)
+        self._queue_times = deque(maxlen=1000)
+        self._counts = {'calls': 0, 'succeeded': 0, 'failed': 0, 'throttled': 0, 'fallbacks': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self._counts[key] += 1
+
+    def _fallback(self, fallback, exc=None):
+        self._count('fallbacks')
+        if fallback is None:
+            if exc is not None:
+                raise exc
+            raise CircuitOpenError("LLM circuit breaker is open")
+        return fallback()
+
+    def call(self, fn, tokens=0, requests=1, fallback=None):
+        """Run `fn` under the governor.
+
+        `requests` and `tokens` are the estimated number of provider requests and
+        prompt-plus-output tokens `fn` will use, charged against the per-minute
+        buckets. While the breaker is open, or when the provider throttles, the
+        result of `fallback()` is returned instead (or the error raised if no
+        fallback is given). Other exceptions propagate unchanged.
+        """
+        self._count('calls')
+        if not self.breaker.allow():
+            return self._fallback(fallback)
+
+        queued = time.monotonic()
+        self.limiter.acquire()
+        try:
+            self.request_bucket.acquire(requests)
+            if tokens:
+                self.token_bucket.acquire(tokens)
+        except BaseException:
+            self.limiter.release()
+            raise
+        with self._lock:
+            self._queue_times.append(time.monotonic() - queued)
+
+        try:
+            result = fn()
+        except Exception as exc:
+            throttled = is_throttle_error(exc)
+            self.limiter.release(throttled=throttled)
+            self.breaker.record_failure()
+            self._count('throttled' if throttled else 'failed')
+            if throttled:
+                return self._fallback(fallback, exc)
+            raise
+        self.limiter.release()
+        self.breaker.record_success()
+        self._count('succeeded')
+        return result
+
+    def set_rate_limits(self, requests_per_minute, tokens_per_minute):
+        """Resize both per-minute buckets, e.g. when a global quota is split between processes."""
+        self.request_bucket.set_rate(requests_per_minute)
+        self.token_bucket.set_rate(tokens_per_minute)
+
+    def metrics(self):
+        """Snapshot of outcome counts, queue times and limiter/breaker state."""
+        with self._lock:
+            waits = sorted(self._queue_times)
+            counts = dict(self._counts)
+
+        def pct(p):
+            return waits[min(len(waits) - 1, int(p / 100.0 * len(waits)))] if waits else 0.0
+
+        return {
+            **counts,
+            'queue_time_p50_s': pct(50),
+            'queue_time_p95_s': pct(95),
+            'queue_time_max_s': waits[-1] if waits else 0.0,
+            'requests_per_minute': self.request_bucket.rate * 60.0,
+            'tokens_per_minute': self.token_bucket.rate * 60.0,
+            'concurrency_limit': self.limiter.limit,
+            'in_flight': self.limiter.in_flight,
+            'circuit_state': self.breaker.state,
+        }
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def configured_rate_limits():
+    """Provider-wide requests/tokens per minute from LLM_REQUESTS_PER_MINUTE / LLM_TOKENS_PER_MINUTE."""
+    return {
+        'requests_per_minute': float(os.getenv('LLM_REQUESTS_PER_MINUTE', 60)),
+        'tokens_per_minute': float(os.getenv('LLM_TOKENS_PER_MINUTE', 100_000)),
+    }
+
+
+def get_governor():
+    """Process-wide governor, configured from LLM_* environment variables."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = LLMGovernor(
+                **configured_rate_limits(),
+                initial_concurrency=int(os.getenv('LLM_INITIAL_CONCURRENCY', 4)),
+                max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 32)),
+                failure_threshold=int(os.getenv('LLM_BREAKER_FAILURES', 5)),
+                reset_timeout=float(os.getenv('LLM_BREAKER_RESET_SECONDS', 30)),
+            )
+        return _governor
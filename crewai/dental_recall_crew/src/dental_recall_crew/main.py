@@ -2,9 +2,13 @@
 import sys
 import warnings
 
+from contextlib import closing
+
 from datetime import datetime
 
+from dental_recall_crew.checkpoints import CheckpointStore
 from dental_recall_crew.crew import DentalRecallCrew
+from dental_recall_crew.sharding import ShardedReminderPool, WorkerDiedError
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -29,7 +33,7 @@ def run():
     }
 
     try:
-        result = DentalRecallCrew().crew().kickoff(inputs=inputs)
+        result = DentalRecallCrew().governed_kickoff(inputs)
         print("\n" + "="*50)
         print("DENTAL RECALL CREW EXECUTION COMPLETE")
         print("="*50)
@@ -68,6 +72,34 @@ def replay():
         print(f"An error occurred while replaying the crew: {e}", file=sys.stderr)
         sys.exit(1)
 
+def list_incomplete():
+    """
+    List crew runs that started but did not complete, with their completed tasks.
+    """
+    with closing(CheckpointStore()) as store:
+        runs = store.incomplete_runs()
+    if not runs:
+        print("No incomplete runs.")
+    for run in runs:
+        completed = ", ".join(run['completed_tasks']) or "none"
+        print(f"{run['appointment_id']}  [{run['input_hash']}]  started {run['started_at']}  completed: {completed}")
+
+def resume():
+    """
+    Rerun every incomplete run from its first incomplete task.
+    """
+    failures = 0
+    with closing(CheckpointStore()) as store:
+        runs = store.incomplete_runs()
+    for run in runs:
+        inputs = {**run['inputs'], 'current_datetime': datetime.now().isoformat()}
+        try:
+            DentalRecallCrew().governed_kickoff(inputs)
+        except Exception as e:
+            failures += 1
+            print(f"An error occurred while resuming {run['appointment_id']}: {e}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
 def test():
     """
     Test the crew execution and returns the results.
@@ -112,9 +144,38 @@ def run_with_trigger():
     }
 
     try:
-        result = DentalRecallCrew().crew().kickoff(inputs=inputs)
+        result = DentalRecallCrew().governed_kickoff(inputs)
         print(result)
         sys.exit(0)
     except Exception as e:
         print(f"An error occurred while running the crew with trigger: {e}", file=sys.stderr)
         sys.exit(1)
+
+def run_sharded():
+    """
+    Process a JSONL file of reminder payloads across worker processes, sharded by practice_id.
+    """
+    import json
+
+    if len(sys.argv) < 2:
+        raise Exception("No payload file provided. Usage: run_sharded <payloads.jsonl> [workers]")
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with open(sys.argv[1]) as f:
+        payloads = [json.loads(line) for line in f if line.strip()]
+
+    try:
+        with ShardedReminderPool(workers=workers) as pool:
+            for payload in payloads:
+                pool.submit({**payload, 'current_datetime': datetime.now().isoformat()})
+            results = pool.drain()
+            status = pool.status()
+    except WorkerDiedError as e:
+        print(f"An error occurred while processing reminders: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for worker_id, shard in status['shards'].items():
+        print(f"{worker_id}: {len(shard['practices'])} practices, {shard['processed']} processed, "
+              f"{shard['failed']} failed, {shard['throughput_rps']:.2f} reminders/s")
+    print(f"TOTAL: {status['processed']} processed, {status['failed']} failed")
+    sys.exit(1 if any(r['error'] for r in results) else 0)
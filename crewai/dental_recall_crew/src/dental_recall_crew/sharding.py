@@ -0,0 +1,362 @@
+"""
+Multi-practice sharding of reminder processing across worker processes.
+
+Practices are assigned to workers on a consistent-hash ring, so every reminder
+for a practice is handled by the same process, in order. Each worker keeps its
+own scheduler state for the practices it owns, and its own LLM governor holding
+an equal share of the provider-wide rate limits; the shares are recomputed
+whenever a worker joins or leaves. Adding or removing a worker only moves the
+practices whose ring segment changed; their scheduler state is handed from the
+old owner to the new one before any further reminders are routed.
+
+Waiting on workers is liveness-checked: if a worker process dies, the pool
+raises WorkerDiedError naming the shard instead of blocking forever.
+"""
+import hashlib
+import multiprocessing
+import queue
+import time
+from bisect import bisect_right
+from collections import deque
+
+from dental_recall_crew.llm_governor import configured_rate_limits, get_governor
+
+DEFAULT_PRACTICE_ID = 'default'
+VIRTUAL_NODES = 64
+THROUGHPUT_WINDOW_S = 60.0
+LIVENESS_POLL_S = 0.5
+
+
+class WorkerDiedError(RuntimeError):
+    """Raised when a shard worker exits while the pool is waiting on it."""
+
+    def __init__(self, dead):
+        self.dead = dead    # worker id -> {'exitcode', 'lost', 'practices'}
+        details = ', '.join(
+            f"{worker_id} (exit code {info['exitcode']}, {info['lost']} reminders lost, "
+            f"practices: {', '.join(sorted(info['practices'])) or 'none'})"
+            for worker_id, info in sorted(dead.items())
+        )
+        super().__init__(f"Shard worker exited unexpectedly: {details}")
+
+
+def _ring_hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes."""
+
+    def __init__(self, nodes=(), replicas=VIRTUAL_NODES):
+        self.replicas = replicas
+        self._points = []   # sorted hashes
+        self._owners = {}   # hash -> node
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self):
+        return len(set(self._owners.values()))
+
+    def add(self, node):
+        for i in range(self.replicas):
+            point = _ring_hash(f"{node}#{i}")
+            self._owners[point] = node
+        self._points = sorted(self._owners)
+
+    def remove(self, node):
+        self._owners = {p: n for p, n in self._owners.items() if n != node}
+        self._points = sorted(self._owners)
+
+    def owner(self, key):
+        if not self._points:
+            raise LookupError("Hash ring has no nodes")
+        i = bisect_right(self._points, _ring_hash(key)) % len(self._points)
+        return self._owners[self._points[i]]
+
+
+def practice_id_of(payload):
+    return payload.get('practice_id') or DEFAULT_PRACTICE_ID
+
+
+def process_reminder(payload):
+    """Default worker task: run the crew for one reminder through the governor."""
+    from dental_recall_crew.crew import DentalRecallCrew
+    return str(DentalRecallCrew().governed_kickoff(payload))
+
+
+class ShardState:
+    """Scheduler state and throughput counters for the practices one worker owns."""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.started = time.monotonic()
+        self.practices = {}
+        self.processed = 0
+        self.failed = 0
+        self.rate_limits = {}
+        self._recent = deque()
+
+    def record(self, practice_id, payload, ok):
+        state = self.practices.setdefault(practice_id, {'processed': 0, 'failed': 0, 'last_appointment_id': None})
+        state['processed' if ok else 'failed'] += 1
+        state['last_appointment_id'] = payload.get('appointment_id')
+        state['last_processed_at'] = time.time()
+        if ok:
+            self.processed += 1
+        else:
+            self.failed += 1
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent and now - self._recent[0] > THROUGHPUT_WINDOW_S:
+            self._recent.popleft()
+
+    def export(self, practice_ids):
+        return {pid: self.practices.pop(pid) for pid in list(practice_ids) if pid in self.practices}
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        window = min(uptime, THROUGHPUT_WINDOW_S)
+        return {
+            'worker_id': self.worker_id,
+            'practices': dict(self.practices),
+            'processed': self.processed,
+            'failed': self.failed,
+            'rate_limits': dict(self.rate_limits),
+            'throughput_rps': len(self._recent) / window if window else 0.0,
+        }
+
+
+def _worker_main(worker_id, inbox, outbox, process):
+    shard = ShardState(worker_id)
+    while True:
+        kind, body = inbox.get()
+        if kind == 'task':
+            practice_id, payload = body
+            try:
+                result, error = process(payload), None
+            except Exception as e:
+                result, error = None, f"{type(e).__name__}: {e}"
+            shard.record(practice_id, payload, error is None)
+            outbox.put(('result', worker_id, {'practice_id': practice_id,
+                                              'appointment_id': payload.get('appointment_id'),
+                                              'result': result, 'error': error}))
+        elif kind == 'import':
+            shard.practices.update(body)
+        elif kind == 'limits':
+            governor = get_governor()
+            governor.set_rate_limits(**body)
+            metrics = governor.metrics()
+            shard.rate_limits = {key: metrics[key] for key in body}
+        elif kind == 'export':
+            outbox.put(('state', worker_id, shard.export(body)))
+        elif kind == 'status':
+            outbox.put(('status', worker_id, shard.snapshot()))
+        elif kind == 'stop':
+            outbox.put(('state', worker_id, shard.export(list(shard.practices))))
+            return
+
+
+class ShardedReminderPool:
+    """Pool of worker processes that partitions reminders by practice id."""
+
+    def __init__(self, workers=4, process=process_reminder, mp_context=None,
+                 requests_per_minute=None, tokens_per_minute=None):
+        self._ctx = mp_context or multiprocessing.get_context()
+        self._process = process
+        self._outbox = self._ctx.Queue()
+        self._workers = {}      # worker id -> (Process, inbox)
+        self._ring = HashRing()
+        self._practices = set()
+        self._pending = {}      # worker id -> reminders submitted but not yet reported
+        self._results = []
+        self._next_id = 0
+        limits = configured_rate_limits()
+        self._rate_limits = {
+            'requests_per_minute': requests_per_minute or limits['requests_per_minute'],
+            'tokens_per_minute': tokens_per_minute or limits['tokens_per_minute'],
+        }
+        for _ in range(workers):
+            self._ring.add(self._start_worker())
+        self._split_rate_limits()
+
+    def _start_worker(self):
+        worker_id = f"worker-{self._next_id}"
+        self._next_id += 1
+        inbox = self._ctx.Queue()
+        proc = self._ctx.Process(target=_worker_main, args=(worker_id, inbox, self._outbox, self._process), daemon=True)
+        proc.start()
+        self._workers[worker_id] = (proc, inbox)
+        return worker_id
+
+    def _send(self, worker_id, kind, body=None):
+        self._workers[worker_id][1].put((kind, body))
+
+    def _split_rate_limits(self):
+        """Give every worker an equal share of the provider-wide rate limits."""
+        share = {key: value / len(self._workers) for key, value in self._rate_limits.items()}
+        for worker_id in self._workers:
+            self._send(worker_id, 'limits', share)
+
+    def _dead_workers(self, worker_ids):
+        dead = {}
+        for worker_id in worker_ids:
+            proc = self._workers[worker_id][0]
+            if not proc.is_alive():
+                dead[worker_id] = {
+                    'exitcode': proc.exitcode,
+                    'lost': self._pending.get(worker_id, 0),
+                    'practices': [pid for pid in self._practices if self._ring.owner(pid) == worker_id],
+                }
+        return dead
+
+    def _next_message(self, watching, deadline=None):
+        """Next outbox message, checking that the workers in `watching()` are still alive.
+
+        Raises queue.Empty once `deadline` passes and WorkerDiedError if a
+        watched worker has exited without leaving a message behind.
+        """
+        while True:
+            wait = LIVENESS_POLL_S
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    raise queue.Empty
+            try:
+                return self._outbox.get(timeout=wait)
+            except queue.Empty:
+                dead = self._dead_workers(watching())
+            if dead:
+                # A worker's last messages are flushed as it exits; take them before giving up
+                try:
+                    return self._outbox.get(timeout=LIVENESS_POLL_S)
+                except queue.Empty:
+                    raise WorkerDiedError(dead) from None
+
+    def _record_result(self, worker_id, body):
+        self._pending[worker_id] -= 1
+        self._results.append(body)
+
+    def _wait_for(self, kind, worker_ids):
+        """Collect one `kind` reply from each worker, buffering results that arrive meanwhile."""
+        waiting, replies = set(worker_ids), {}
+        while waiting:
+            got, worker_id, body = self._next_message(lambda: waiting)
+            if got == 'result':
+                self._record_result(worker_id, body)
+            elif got == kind and worker_id in waiting:
+                waiting.discard(worker_id)
+                replies[worker_id] = body
+        return replies
+
+    def _assignments(self):
+        return {pid: self._ring.owner(pid) for pid in self._practices}
+
+    def _rebalance(self, before, departing=None):
+        """Move scheduler state for practices whose owner changed."""
+        moved = {}
+        for pid, old in before.items():
+            new = self._ring.owner(pid)
+            if new != old:
+                moved.setdefault(old, []).append(pid)
+        for old, pids in moved.items():
+            if old != departing:
+                self._send(old, 'export', pids)
+        states = self._wait_for('state', [w for w in moved if w != departing])
+        if departing is not None:
+            states.update(self._wait_for('state', [departing]))
+        for state in states.values():
+            by_owner = {}
+            for pid, practice_state in state.items():
+                by_owner.setdefault(self._ring.owner(pid), {})[pid] = practice_state
+            for owner, chunk in by_owner.items():
+                self._send(owner, 'import', chunk)
+        return sum(len(p) for p in moved.values())
+
+    @property
+    def worker_ids(self):
+        return list(self._workers)
+
+    def owner(self, practice_id):
+        return self._ring.owner(practice_id)
+
+    def submit(self, payload):
+        """Route one reminder payload to the worker that owns its practice."""
+        practice_id = practice_id_of(payload)
+        owner = self._ring.owner(practice_id)
+        self._practices.add(practice_id)
+        self._pending[owner] = self._pending.get(owner, 0) + 1
+        self._send(owner, 'task', (practice_id, payload))
+
+    def add_worker(self):
+        """Start a worker and hand it the practices that now hash to it. Returns its id."""
+        before = self._assignments()
+        worker_id = self._start_worker()
+        self._ring.add(worker_id)
+        self._rebalance(before)
+        self._split_rate_limits()
+        return worker_id
+
+    def remove_worker(self, worker_id):
+        """Drain and stop a worker, moving its practices to the remaining workers."""
+        if len(self._workers) <= 1:
+            raise ValueError("Cannot remove the last worker")
+        before = self._assignments()
+        self._ring.remove(worker_id)
+        self._send(worker_id, 'stop')
+        self._rebalance(before, departing=worker_id)
+        proc, _ = self._workers.pop(worker_id)
+        proc.join()
+        self._pending.pop(worker_id, None)
+        self._split_rate_limits()
+
+    def drain(self, timeout=None):
+        """Wait for every submitted reminder and return the results collected so far.
+
+        Raises WorkerDiedError if a worker with reminders outstanding exits.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def busy():
+            return [w for w, n in self._pending.items() if n > 0]
+
+        while busy():
+            try:
+                got, worker_id, body = self._next_message(busy, deadline)
+            except queue.Empty:
+                break
+            if got == 'result':
+                self._record_result(worker_id, body)
+        results, self._results = self._results, []
+        return results
+
+    def status(self):
+        """Merged view of every shard's scheduler state and throughput."""
+        for worker_id in self._workers:
+            self._send(worker_id, 'status')
+        shards = self._wait_for('status', list(self._workers))
+        return {
+            'workers': len(shards),
+            'pending': sum(self._pending.values()),
+            'processed': sum(s['processed'] for s in shards.values()),
+            'failed': sum(s['failed'] for s in shards.values()),
+            'throughput_rps': sum(s['throughput_rps'] for s in shards.values()),
+            'assignments': self._assignments(),
+            'shards': shards,
+        }
+
+    def close(self):
+        alive = [w for w, (proc, _) in self._workers.items() if proc.is_alive()]
+        for worker_id in alive:
+            self._send(worker_id, 'stop')
+        try:
+            self._wait_for('state', alive)
+        finally:
+            for proc, _ in self._workers.values():
+                proc.join()
+            self._workers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
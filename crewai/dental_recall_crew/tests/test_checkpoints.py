@@ -0,0 +1,105 @@
+"""
+Tests for per-task crew checkpoints
+"""
+import pytest
+from dental_recall_crew.checkpoints import BUSY_TIMEOUT_S, CheckpointStore, hash_inputs
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    yield store
+    store.close()
+
+
+def task_output(name, raw):
+    return {'description': name, 'name': name, 'raw': raw, 'agent': 'HIPAA Compliance Officer', 'output_format': 'raw'}
+
+
+class TestCheckpoints:
+    """Test checkpoint persistence and incomplete-run listing"""
+
+    def test_hash_ignores_current_datetime(self, sample_appointment_data):
+        """Test that reruns at a later time resolve to the same checkpoint key"""
+        later = {**sample_appointment_data, 'current_datetime': '2030-01-01T00:00:00'}
+        assert hash_inputs(later) == hash_inputs(sample_appointment_data)
+
+    def test_hash_changes_with_inputs(self, sample_appointment_data):
+        """Test that changed inputs do not reuse stale checkpoints"""
+        changed = {**sample_appointment_data, 'message_content': 'Different message'}
+        assert hash_inputs(changed) != hash_inputs(sample_appointment_data)
+
+    def test_completed_tasks_survive_reopen(self, tmp_path, sample_appointment_data):
+        """Test that checkpoints are durable across store instances"""
+        path = str(tmp_path / "checkpoints.db")
+        key = hash_inputs(sample_appointment_data)
+        store = CheckpointStore(path)
+        store.start_run('APT-TEST-001', key, sample_appointment_data)
+        store.save_task('APT-TEST-001', key, 'validate_message_task', task_output('validate_message_task', '{"compliance_status": "APPROVED"}'))
+        store.close()
+
+        completed = CheckpointStore(path).completed_tasks('APT-TEST-001', key)
+        assert list(completed) == ['validate_message_task']
+        assert completed['validate_message_task']['raw'] == '{"compliance_status": "APPROVED"}'
+
+    def test_incomplete_runs_listed_until_finished(self, store, sample_appointment_data, sample_24h_reminder_data):
+        """Test that only unfinished runs are reported, with their completed tasks"""
+        key_48h = hash_inputs(sample_appointment_data)
+        key_24h = hash_inputs(sample_24h_reminder_data)
+        store.start_run('APT-TEST-001', key_48h, sample_appointment_data)
+        store.start_run('APT-TEST-002', key_24h, sample_24h_reminder_data)
+        store.save_task('APT-TEST-001', key_48h, 'validate_message_task', task_output('validate_message_task', 'ok'))
+        store.save_task('APT-TEST-001', key_48h, 'schedule_reminder_task', task_output('schedule_reminder_task', 'ok'))
+        store.finish_run('APT-TEST-002', key_24h)
+
+        runs = store.incomplete_runs()
+
+        assert [r['appointment_id'] for r in runs] == ['APT-TEST-001']
+        assert sorted(runs[0]['completed_tasks']) == ['schedule_reminder_task', 'validate_message_task']
+        assert runs[0]['inputs']['patient_id'] == 'PAT-TEST-001'
+
+    def test_superseded_runs_are_not_resumed(self, store, sample_appointment_data):
+        """Test that a run with new inputs for the same appointment replaces the older one"""
+        changed = {**sample_appointment_data, 'message_content': 'Different message'}
+        store.start_run('APT-TEST-001', hash_inputs(sample_appointment_data), sample_appointment_data)
+        store.start_run('APT-TEST-001', hash_inputs(changed), changed)
+
+        runs = store.incomplete_runs()
+
+        assert [r['input_hash'] for r in runs] == [hash_inputs(changed)]
+        store.finish_run('APT-TEST-001', hash_inputs(changed))
+        assert store.incomplete_runs() == []
+
+    def test_shard_workers_wait_for_the_write_lock(self, store):
+        """Test that the shared database is in WAL mode and writers wait instead of failing fast"""
+        assert store._conn.execute("PRAGMA journal_mode").fetchone() == ('wal',)
+        assert store._conn.execute("PRAGMA busy_timeout").fetchone() == (int(BUSY_TIMEOUT_S * 1000),)
+
+    def test_concurrent_writers_share_one_database(self, tmp_path, sample_appointment_data):
+        """Test that several worker processes checkpointing at once all land"""
+        import multiprocessing
+
+        path = str(tmp_path / "checkpoints.db")
+        CheckpointStore(path).close()
+        ctx = multiprocessing.get_context('spawn')
+        workers = [ctx.Process(target=write_checkpoints, args=(path, f"APT-{i}", sample_appointment_data)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+        assert [worker.exitcode for worker in workers] == [0, 0, 0, 0]
+
+        store = CheckpointStore(path)
+        key = hash_inputs(sample_appointment_data)
+        assert all(len(store.completed_tasks(f"APT-{i}", key)) == 50 for i in range(4))
+        store.close()
+
+
+def write_checkpoints(path, appointment_id, inputs):
+    store = CheckpointStore(path)
+    key = hash_inputs(inputs)
+    store.start_run(appointment_id, key, inputs)
+    for n in range(50):
+        store.save_task(appointment_id, key, f"task_{n}", task_output(f"task_{n}", 'ok'))
+    store.finish_run(appointment_id, key)
+    store.close()
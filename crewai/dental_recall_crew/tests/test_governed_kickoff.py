@@ -0,0 +1,61 @@
+"""
+Tests for running the crew through the LLM governor
+"""
+import pytest
+
+pytest.importorskip('crewai')
+
+from crewai.llms.providers.gemini.completion import GeminiCompletion
+from dental_recall_crew import crew as crew_module
+from dental_recall_crew.checkpoints import CheckpointStore, hash_inputs
+from dental_recall_crew.crew import DentalRecallCrew
+from dental_recall_crew.llm_governor import LLMGovernor
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+@pytest.fixture
+def governor(monkeypatch, tmp_path):
+    monkeypatch.setenv('CHECKPOINT_DB', str(tmp_path / "checkpoints.db"))
+    governor = LLMGovernor(requests_per_minute=60, tokens_per_minute=100_000)
+    monkeypatch.setattr(crew_module, 'get_governor', lambda: governor)
+    return governor
+
+
+class TestGovernedKickoff:
+    """Test that throttling reaches the governor instead of crewai's retries"""
+
+    def test_throttled_kickoff_calls_provider_once(self, monkeypatch, governor, sample_appointment_data):
+        """Test that a 429 is not retried by the agent before the governor sees it"""
+        calls = []
+
+        def throttled(self, *args, **kwargs):
+            calls.append(self.model)
+            raise RateLimitError("429 RESOURCE_EXHAUSTED")
+
+        monkeypatch.setattr(GeminiCompletion, 'call', throttled)
+        result = DentalRecallCrew().governed_kickoff(sample_appointment_data)
+
+        assert len(calls) == 1
+        assert governor.metrics()['throttled'] == 1
+        assert result['message_status'] == 'DEFERRED'
+
+    def test_completed_tasks_are_not_charged(self, monkeypatch, governor, sample_appointment_data):
+        """Test that a resumed run only charges the governor for its remaining tasks"""
+        charged = []
+        monkeypatch.setattr(governor, 'call', lambda fn, tokens, requests, fallback: charged.append((requests, tokens)))
+        crew = DentalRecallCrew()
+        store = CheckpointStore()
+        key = hash_inputs(sample_appointment_data)
+        store.start_run('APT-TEST-001', key, sample_appointment_data)
+        store.save_task('APT-TEST-001', key, 'validate_message_task', {'name': 'validate_message_task', 'raw': 'ok'})
+        store.close()
+
+        crew.governed_kickoff(sample_appointment_data)
+
+        requests, tokens = crew.llm_budget(sample_appointment_data)
+        assert requests == 3
+        assert charged == [crew.llm_budget(sample_appointment_data, ['validate_message_task'])]
+        assert charged[0][0] == 2 and charged[0][1] < tokens
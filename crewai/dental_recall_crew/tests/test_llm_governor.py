@@ -0,0 +1,165 @@
+"""
+Tests for the shared LLM call governor
+"""
+import threading
+import time
+import pytest
+from dental_recall_crew.fallback import deterministic_reminder_report
+from dental_recall_crew.llm_governor import (
+    AIMDLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMGovernor,
+    TokenBucket,
+)
+
+
+class RateLimitError(Exception):
+    """Mimics a provider 429 response"""
+    status_code = 429
+
+
+class FakeProvider:
+    """Local stand-in for the LLM provider that throttles above a concurrency cap"""
+
+    def __init__(self, max_concurrent=2, throttle_first=0, latency=0.0):
+        self.max_concurrent = max_concurrent
+        self.throttle_first = throttle_first
+        self.latency = latency
+        self.in_flight = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            throttled = self.calls <= self.throttle_first or self.in_flight > self.max_concurrent
+        try:
+            time.sleep(self.latency)
+            if throttled:
+                raise RateLimitError("429 Resource exhausted")
+            return "ok"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLLMGovernor:
+    """Test rate limiting, adaptive concurrency and circuit breaking"""
+
+    def test_token_bucket_refills_over_time(self):
+        """Test that the bucket only admits what has been refilled"""
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=60, capacity=2, clock=clock)
+        bucket.acquire(2)
+        assert bucket.tokens == 0
+        clock.now = 1.0
+        bucket.acquire(1)
+        assert bucket.tokens == pytest.approx(0)
+
+    def test_call_charges_estimated_requests_and_tokens(self):
+        """Test that one kickoff is charged for every provider request it makes"""
+        governor = LLMGovernor(requests_per_minute=60, tokens_per_minute=10_000, clock=FakeClock())
+        assert governor.call(lambda: 'done', tokens=2500, requests=3) == 'done'
+        assert governor.request_bucket.tokens == pytest.approx(57)
+        assert governor.token_bucket.tokens == pytest.approx(7500)
+
+    def test_rate_limits_can_be_resized_in_place(self):
+        """Test that a smaller share caps the bucket and slows the refill"""
+        clock = FakeClock()
+        governor = LLMGovernor(requests_per_minute=60, tokens_per_minute=6000, clock=clock)
+        governor.set_rate_limits(requests_per_minute=15, tokens_per_minute=1500)
+        assert governor.request_bucket.tokens == 15
+        assert governor.metrics()['requests_per_minute'] == pytest.approx(15)
+        governor.request_bucket.acquire(15)
+        clock.now = 4.0
+        governor.request_bucket.acquire(1)
+        assert governor.request_bucket.tokens == pytest.approx(0)
+
+    def test_aimd_halves_on_throttle_and_grows_on_success(self):
+        """Test additive increase / multiplicative decrease of the concurrency limit"""
+        limiter = AIMDLimiter(initial=8, minimum=1, maximum=16)
+        limiter.acquire()
+        limiter.release(throttled=True)
+        assert limiter.limit == 4
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release()
+        assert limiter.limit == pytest.approx(5, abs=0.1)
+
+    def test_breaker_opens_then_half_opens_after_timeout(self):
+        """Test that the breaker opens on failures and lets one probe through later"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert not breaker.allow()
+        clock.now = 10
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_throttled_calls_use_fallback_and_open_breaker(self):
+        """Test that provider 429s fall back to the deterministic path"""
+        provider = FakeProvider(throttle_first=3)
+        governor = LLMGovernor(requests_per_minute=6000, failure_threshold=3)
+
+        results = [governor.call(provider.complete, fallback=lambda: "fallback") for _ in range(5)]
+
+        assert results == ["fallback"] * 5
+        assert provider.calls == 3  # the breaker stopped the last two before the provider
+        metrics = governor.metrics()
+        assert metrics['throttled'] == 3
+        assert metrics['fallbacks'] == 5
+        assert metrics['circuit_state'] == CircuitBreaker.OPEN
+
+    def test_open_breaker_without_fallback_raises(self):
+        """Test that an open breaker raises when no fallback is available"""
+        governor = LLMGovernor(failure_threshold=1)
+        governor.breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            governor.call(lambda: "never")
+
+    def test_concurrency_adapts_to_provider_capacity(self):
+        """Test that concurrent load settles under the provider's throttling cap"""
+        provider = FakeProvider(max_concurrent=2, latency=0.002)
+        governor = LLMGovernor(requests_per_minute=60000, initial_concurrency=8, failure_threshold=1000)
+
+        def worker():
+            for _ in range(20):
+                governor.call(provider.complete, fallback=lambda: "fallback")
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        metrics = governor.metrics()
+        assert metrics['calls'] == 160
+        assert metrics['throttled'] > 0
+        # A fixed concurrency of 8 against this provider throttles nearly every call
+        assert metrics['throttled'] < metrics['calls'] / 2
+        assert metrics['queue_time_max_s'] >= 0
+
+    def test_deterministic_fallback_blocks_phi(self, hipaa_violation_data):
+        """Test that the fallback path still blocks unmasked PHI"""
+        report = deterministic_reminder_report(hipaa_violation_data)
+        assert report['compliance_status'] == 'BLOCKED'
+        assert 'Unmasked PHI: ssn' in report['violations']
+
+    def test_deterministic_fallback_defers_clean_message(self, sample_appointment_data):
+        """Test that a compliant message is deferred, never sent, while the LLM is down"""
+        report = deterministic_reminder_report(sample_appointment_data)
+        assert report['compliance_status'] == 'APPROVED'
+        assert report['message_status'] == 'DEFERRED'
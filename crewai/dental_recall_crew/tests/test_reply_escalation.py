@@ -0,0 +1,56 @@
+"""
+Tests for escalating free-text patient replies to the Dental Scheduler agent
+"""
+import pytest
+
+pytest.importorskip('crewai')
+
+from crewai import Crew, CrewOutput
+from dental_recall_crew import crew as crew_module
+from dental_recall_crew.crew import DentalRecallCrew, parse_reply_intent
+from dental_recall_crew.llm_governor import LLMGovernor
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    governor = LLMGovernor(requests_per_minute=60, tokens_per_minute=100_000)
+    monkeypatch.setattr(crew_module, 'get_governor', lambda: governor)
+    return governor
+
+
+def answer_with(monkeypatch, raw=None, error=None):
+    seen = []
+
+    def kickoff(self, inputs=None):
+        seen.append((self.tasks[0].agent.role.strip(), inputs))
+        if error:
+            raise error
+        return CrewOutput(raw=raw, tasks_output=[])
+
+    monkeypatch.setattr(Crew, 'kickoff', kickoff)
+    return seen
+
+
+class TestReplyEscalation:
+    """Test the governed single-agent reply classification"""
+
+    def test_parse_reply_intent(self):
+        """Test that the first intent named in the answer is used"""
+        assert parse_reply_intent('RESCHEDULE') == 'RESCHEDULE'
+        assert parse_reply_intent('The patient wants to cancel.') == 'CANCEL'
+        assert parse_reply_intent('UNKNOWN - asks about parking') is None
+        assert parse_reply_intent('') is None
+
+    def test_reply_goes_to_scheduler_through_governor(self, monkeypatch, governor):
+        """Test that the agent sees the reply and one request is charged"""
+        seen = answer_with(monkeypatch, raw='RESCHEDULE')
+        assert DentalRecallCrew().classify_reply('Could we do Friday instead') == 'RESCHEDULE'
+        assert seen == [('Dental Appointment Scheduler', {'reply': 'Could we do Friday instead'})]
+        assert governor.metrics()['succeeded'] == 1
+        assert governor.request_bucket.tokens == pytest.approx(59, abs=0.1)
+
+    def test_throttled_escalation_returns_none(self, monkeypatch, governor):
+        """Test that a rate-limited provider leaves the reply for staff review"""
+        answer_with(monkeypatch, error=RuntimeError('429 rate limit exceeded'))
+        assert DentalRecallCrew().classify_reply('who is this') is None
+        assert governor.metrics()['fallbacks'] == 1
@@ -0,0 +1,78 @@
+"""
+Tests for resuming a failed crew run from its checkpoints
+"""
+import pytest
+
+pytest.importorskip('crewai')
+
+from crewai import Crew, CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from dental_recall_crew.checkpoints import CheckpointStore
+from dental_recall_crew.crew import DentalRecallCrew
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def fake_kickoff(monkeypatch):
+    """Replace Crew.kickoff with a run that records each task and the context it saw."""
+    state = {'ran': [], 'context': {}, 'fail_on': None}
+
+    def kickoff(self, inputs=None):
+        for t in self.tasks:
+            if t.name == state['fail_on']:
+                raise RuntimeError(f"{t.name} failed")
+            state['ran'].append(t.name)
+            state['context'][t.name] = [c.output.raw for c in t.context or []]
+            t.output = TaskOutput(description=t.description, name=t.name, raw=f"done {t.name}",
+                                  agent=t.agent.role)
+            self.task_callback(t.output)
+        return CrewOutput(raw=self.tasks[-1].output.raw, tasks_output=[t.output for t in self.tasks])
+
+    monkeypatch.setattr(Crew, 'kickoff', kickoff)
+    return state
+
+
+class TestResumableKickoff:
+    """Test that reruns skip checkpointed tasks and reuse their outputs"""
+
+    def test_rerun_skips_saved_tasks_and_restores_context(self, store, fake_kickoff, sample_appointment_data):
+        """Test that a rerun starts at the failed task with saved outputs as context"""
+        fake_kickoff['fail_on'] = 'schedule_reminder_task'
+        with pytest.raises(RuntimeError):
+            DentalRecallCrew().resumable_kickoff(sample_appointment_data, store)
+        assert fake_kickoff['ran'] == ['validate_message_task']
+        assert [r['completed_tasks'] for r in store.incomplete_runs()] == [['validate_message_task']]
+
+        fake_kickoff.update(ran=[], context={}, fail_on=None)
+        result = DentalRecallCrew().resumable_kickoff(sample_appointment_data, store)
+        assert fake_kickoff['ran'] == ['schedule_reminder_task', 'coordinate_reminders_task']
+        assert fake_kickoff['context']['schedule_reminder_task'] == ['done validate_message_task']
+        assert fake_kickoff['context']['coordinate_reminders_task'] == [
+            'done validate_message_task', 'done schedule_reminder_task']
+        assert result.raw == 'done coordinate_reminders_task'
+        assert store.incomplete_runs() == []
+
+    def test_completed_run_is_not_kicked_off_again(self, store, fake_kickoff, sample_appointment_data):
+        """Test that a fully checkpointed run is rebuilt from saved outputs"""
+        DentalRecallCrew().resumable_kickoff(sample_appointment_data, store)
+        fake_kickoff['ran'] = []
+        result = DentalRecallCrew().resumable_kickoff(sample_appointment_data, store)
+        assert fake_kickoff['ran'] == []
+        assert [t.raw for t in result.tasks_output] == [
+            'done validate_message_task', 'done schedule_reminder_task', 'done coordinate_reminders_task']
+
+    def test_store_created_by_kickoff_is_closed(self, monkeypatch, tmp_path, fake_kickoff, sample_appointment_data):
+        """Test that the default checkpoint store is closed even when the run fails"""
+        monkeypatch.setenv('CHECKPOINT_DB', str(tmp_path / "checkpoints.db"))
+        closed = []
+        monkeypatch.setattr(CheckpointStore, 'close', lambda self: closed.append(self))
+        fake_kickoff['fail_on'] = 'validate_message_task'
+        with pytest.raises(RuntimeError):
+            DentalRecallCrew().resumable_kickoff(sample_appointment_data)
+        assert len(closed) == 1
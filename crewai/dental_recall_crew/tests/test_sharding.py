@@ -0,0 +1,130 @@
+"""
+Tests for multi-practice sharding of reminder processing
+"""
+import os
+import pytest
+from dental_recall_crew.sharding import HashRing, ShardedReminderPool, WorkerDiedError
+
+
+def echo_pid(payload):
+    """Stand-in for the crew: report which process handled the reminder"""
+    if payload.get('fail'):
+        raise RuntimeError("provider error")
+    if payload.get('crash'):
+        os._exit(3)
+    return os.getpid()
+
+
+def reminders(practices, per_practice):
+    return [
+        {'practice_id': practice, 'appointment_id': f"APT-{practice}-{i}"}
+        for practice in practices
+        for i in range(per_practice)
+    ]
+
+
+PRACTICES = [f"practice-{i}" for i in range(24)]
+
+
+class TestHashRing:
+    """Test consistent-hash assignment of practices"""
+
+    def test_adding_a_node_moves_only_its_share(self):
+        """Test that a new worker only takes over part of the keyspace"""
+        ring = HashRing(['worker-0', 'worker-1', 'worker-2'])
+        keys = [f"practice-{i}" for i in range(1000)]
+        before = {k: ring.owner(k) for k in keys}
+        ring.add('worker-3')
+        moved = [k for k in keys if ring.owner(k) != before[k]]
+
+        assert all(ring.owner(k) == 'worker-3' for k in moved)
+        assert 150 < len(moved) < 350
+
+    def test_empty_ring_raises(self):
+        """Test that routing without workers fails loudly"""
+        with pytest.raises(LookupError):
+            HashRing().owner('Smile Dental')
+
+
+class TestShardedReminderPool:
+    """Test routing, rebalancing and merged status"""
+
+    def test_each_practice_is_handled_by_one_process(self):
+        """Test that every reminder for a practice runs on the same worker"""
+        with ShardedReminderPool(workers=3, process=echo_pid) as pool:
+            for payload in reminders(PRACTICES, 3):
+                pool.submit(payload)
+            results = pool.drain(timeout=30)
+
+        assert len(results) == len(PRACTICES) * 3
+        pids_by_practice = {}
+        for r in results:
+            pids_by_practice.setdefault(r['practice_id'], set()).add(r['result'])
+        assert all(len(pids) == 1 for pids in pids_by_practice.values())
+
+    def test_rebalance_hands_off_scheduler_state(self):
+        """Test that practice state follows the practice when workers change"""
+        with ShardedReminderPool(workers=2, process=echo_pid) as pool:
+            for payload in reminders(PRACTICES, 2):
+                pool.submit(payload)
+            pool.drain(timeout=30)
+
+            added = pool.add_worker()
+            removed = pool.worker_ids[0]
+            pool.remove_worker(removed)
+            for payload in reminders(PRACTICES, 1):
+                pool.submit(payload)
+            pool.drain(timeout=30)
+            status = pool.status()
+
+        assert removed not in status['shards']
+        assert any(status['assignments'][p] == added for p in PRACTICES)
+        for worker_id, shard in status['shards'].items():
+            for practice, state in shard['practices'].items():
+                assert status['assignments'][practice] == worker_id
+                assert state['processed'] == 3
+        assert sorted(p for s in status['shards'].values() for p in s['practices']) == sorted(PRACTICES)
+
+    def test_status_merges_shard_metrics(self):
+        """Test that the merged view sums per-shard counts, including failures"""
+        with ShardedReminderPool(workers=2, process=echo_pid) as pool:
+            for payload in reminders(PRACTICES[:6], 2):
+                pool.submit(payload)
+            pool.submit({'practice_id': 'Smile Dental', 'appointment_id': 'APT-FAIL', 'fail': True})
+            results = pool.drain(timeout=30)
+            status = pool.status()
+
+        assert status['processed'] == 12
+        assert status['failed'] == 1
+        assert status['processed'] == sum(s['processed'] for s in status['shards'].values())
+        assert status['throughput_rps'] > 0
+        assert [r['error'] for r in results if r['appointment_id'] == 'APT-FAIL'] == ['RuntimeError: provider error']
+
+    def test_rate_limits_are_split_between_workers(self):
+        """Test that workers share the global quota and reshare it when the pool changes"""
+        def limits(pool):
+            return [s['rate_limits'] for s in pool.status()['shards'].values()]
+
+        with ShardedReminderPool(workers=4, process=echo_pid,
+                                 requests_per_minute=120, tokens_per_minute=40_000) as pool:
+            assert limits(pool) == [{'requests_per_minute': pytest.approx(30),
+                                     'tokens_per_minute': pytest.approx(10_000)}] * 4
+            pool.remove_worker(pool.worker_ids[0])
+            assert limits(pool) == [{'requests_per_minute': pytest.approx(40),
+                                     'tokens_per_minute': pytest.approx(40_000 / 3)}] * 3
+            pool.add_worker()
+            assert limits(pool) == [{'requests_per_minute': pytest.approx(30),
+                                     'tokens_per_minute': pytest.approx(10_000)}] * 4
+
+    def test_dead_worker_is_reported_instead_of_hanging(self):
+        """Test that drain raises with the dead shard rather than blocking forever"""
+        with ShardedReminderPool(workers=2, process=echo_pid) as pool:
+            owner = pool.owner('Smile Dental')
+            pool.submit({'practice_id': 'Smile Dental', 'appointment_id': 'APT-CRASH', 'crash': True})
+            with pytest.raises(WorkerDiedError) as info:
+                pool.drain(timeout=30)
+
+        assert list(info.value.dead) == [owner]
+        assert info.value.dead[owner]['exitcode'] == 3
+        assert info.value.dead[owner]['practices'] == ['Smile Dental']
+        assert owner in str(info.value)
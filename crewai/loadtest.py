@@ -0,0 +1,244 @@
+"""
+Open-loop load generator for the Flask backend.
+
+Replays a mix of /schedule, /audit and /ai/schedule traffic at a target
+request rate and reports latency percentiles, error rate and throughput.
+
+    python loadtest.py --rps 50 --duration 30                 # in-process
+    python loadtest.py --url http://127.0.0.1:5000 --rps 50   # running server
+    python loadtest.py --save-baseline baseline.json
+    python loadtest.py --baseline baseline.json
+
+Arrivals follow a Poisson process and are dispatched on schedule whether or
+not earlier requests have finished, and latency is measured from the intended
+send time, so a slow server shows up as queueing delay instead of silently
+lowering the offered load. In-process runs start from the app state at
+startup, and a baseline is only compared against a run with the same --rps
+and --duration, since /schedule grows with every appointment the run posts.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# (weight, name, method, path)
+TRAFFIC_MIX = [
+    (0.35, 'schedule_post', 'POST', '/schedule'),
+    (0.35, 'schedule_get', 'GET', '/schedule'),
+    (0.20, 'audit', 'POST', '/audit'),
+    (0.10, 'ai_schedule', 'POST', '/ai/schedule'),
+]
+
+
+def build_payload(name, rng):
+    if name == 'schedule_post':
+        return {
+            'patient_name': f"Load Patient {rng.randrange(10000)}",
+            'patient_id': f"PAT-LOAD-{rng.randrange(10000):05d}",
+            'date': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'time': f"{rng.randint(8, 17):02d}:{rng.choice(['00', '30'])}",
+        }
+    if name == 'audit':
+        return {'action': 'reminder_sent', 'patient_id': f"PAT-LOAD-{rng.randrange(10000):05d}"}
+    if name == 'ai_schedule':
+        return {'patient_name': 'Patient', 'history': []}
+    return None
+
+
+class InProcessClient:
+    """Sends requests through Flask's test client, one client per worker thread."""
+
+    def __init__(self):
+        from app import app
+        from routes.scheduling import APPOINTMENTS
+        self.app = app
+        self._appointments = list(APPOINTMENTS)
+        self._local = threading.local()
+
+    def reset(self):
+        """Drop the appointments posted by earlier runs so every run starts alike."""
+        from routes.scheduling import APPOINTMENTS
+        from services.phi_masking import PHI_MASKER
+        from services.recall_cohort import RECALL_INDEX
+        kept = {id(appt) for appt in self._appointments}
+        for appt in APPOINTMENTS:
+            if id(appt) not in kept:
+                PHI_MASKER.remove(('patient', appt['patient_id'] or appt['patient_name']))
+        APPOINTMENTS[:] = self._appointments
+        RECALL_INDEX.clear()
+        RECALL_INDEX.load(APPOINTMENTS)
+
+    def request(self, method, path, payload):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client.open(path, method=method, json=payload).status_code
+
+
+class HTTPClient:
+    """Sends requests to a running server, one session per worker thread."""
+
+    def __init__(self, base_url, timeout):
+        import requests
+        self._requests = requests
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def reset(self):
+        """A running server's state is not ours to reset."""
+
+    def request(self, method, path, payload):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        return session.request(method, self.base_url + path, json=payload, timeout=self.timeout).status_code
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    rank = math.ceil(pct / 100.0 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(s['latency_ms'] for s in samples)
+    errors = sum(1 for s in samples if s['error'])
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+    }
+
+
+def run_load(client, rps, duration, seed=0, max_workers=64):
+    """Offer `rps` requests/second for `duration` seconds; return the report dict."""
+    if rps <= 0 or duration <= 0:
+        raise ValueError('rps and duration must be positive')
+    client.reset()
+    rng = random.Random(seed)
+    weights = [w for w, _, _, _ in TRAFFIC_MIX]
+    schedule = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(rps)
+        if t >= duration:
+            break
+        _, name, method, path = rng.choices(TRAFFIC_MIX, weights)[0]
+        schedule.append((t, name, method, path, build_payload(name, rng)))
+
+    samples = []
+    lock = threading.Lock()
+
+    def fire(intended, name, method, path, payload):
+        try:
+            error = client.request(method, path, payload) >= 400
+        except Exception:
+            error = True
+        latency_ms = (time.perf_counter() - intended) * 1000.0
+        with lock:
+            samples.append({'route': name, 'latency_ms': latency_ms, 'error': error})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for offset, name, method, path, payload in schedule:
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, intended, name, method, path, payload)
+    elapsed = time.perf_counter() - start
+
+    report = {'target_rps': rps, 'duration_s': duration, 'overall': summarize(samples, elapsed), 'routes': {}}
+    for _, name, _, _ in TRAFFIC_MIX:
+        route_samples = [s for s in samples if s['route'] == name]
+        report['routes'][name] = summarize(route_samples, elapsed)
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Print deltas against a saved baseline; return True if nothing regressed.
+
+    A baseline offered at a different rate or for a different duration is not
+    comparable and always fails.
+    """
+    mismatched = [key for key in ('target_rps', 'duration_s') if baseline.get(key) != report[key]]
+    if mismatched:
+        print("\nBaseline is not comparable: " + ', '.join(
+            f"{key} {baseline.get(key)} vs {report[key]}" for key in mismatched))
+        return False
+    ok = True
+    print(f"\n{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'error_rate', 'throughput_rps'):
+        old = baseline['overall'][metric]
+        new = report['overall'][metric]
+        change = (new - old) / old if old else 0.0
+        if metric == 'throughput_rps':
+            worse = change < -tolerance
+        elif metric == 'error_rate':
+            # Compared in absolute terms; a relative change from ~0 is meaningless
+            worse = new - old > 0.01
+        else:
+            worse = change > tolerance
+        ok = ok and not worse
+        print(f"{metric:<16}{old:>12.3f}{new:>12.3f}{change:>+9.1%}{'  REGRESSION' if worse else ''}")
+    return ok
+
+
+def print_report(report):
+    print(f"Target {report['target_rps']} rps for {report['duration_s']}s")
+    print(f"{'route':<16}{'reqs':>7}{'err%':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    rows = list(report['routes'].items()) + [('overall', report['overall'])]
+    for name, s in rows:
+        print(f"{name:<16}{s['requests']:>7}{s['error_rate'] * 100:>6.1f}%{s['throughput_rps']:>9.1f}"
+              f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running server (default: run the app in-process)')
+    parser.add_argument('--rps', type=float, default=50.0, help='Target requests per second')
+    parser.add_argument('--duration', type=float, default=10.0, help='Test duration in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout for --url mode')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write the report as a JSON baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against a saved JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+    if args.rps <= 0 or args.duration <= 0:
+        parser.error('--rps and --duration must be positive')
+
+    if args.url:
+        report = run_load(HTTPClient(args.url, args.timeout), args.rps, args.duration, args.seed)
+    else:
+        # The demo routes print every request; keep that out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = run_load(InProcessClient(), args.rps, args.duration, args.seed)
+
+    print_report(report)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
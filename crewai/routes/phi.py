@@ -0,0 +1,50 @@
+from flask import Blueprint, request, jsonify
+
+phi_bp = Blueprint('phi', __name__)
+
+from services.phi_masking import PHI_MASKER
+
+def _valid_people(people):
+    return isinstance(people, list) and all(
+        isinstance(person, dict) and _valid_scalar(person.get('id')) and _valid_scalar(person.get('name'))
+        for person in people
+    )
+
+
+def _valid_scalar(value):
+    return isinstance(value, (str, int)) and str(value).strip() != ''
+
+
+@phi_bp.route('/phi/roster', methods=['POST'])
+def update_roster():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    # Validate everything before changing the roster
+    if not all(_valid_people(data.get(field, [])) for field in ('patients', 'providers')):
+        return jsonify({'error': 'patients and providers must be lists of {id, name}'}), 400
+    if not all(isinstance(data.get(field, []), list) and all(_valid_scalar(i) for i in data.get(field, []))
+               for field in ('remove_patients', 'remove_providers')):
+        return jsonify({'error': 'remove_patients and remove_providers must be lists of ids'}), 400
+    for person in data.get('patients', []):
+        PHI_MASKER.add_patient(person['id'], person['name'])
+    for person in data.get('providers', []):
+        PHI_MASKER.add_provider(person['id'], person['name'])
+    for patient_id in data.get('remove_patients', []):
+        PHI_MASKER.remove(('patient', patient_id))
+    for provider_id in data.get('remove_providers', []):
+        PHI_MASKER.remove(('provider', provider_id))
+    return jsonify({'status': 'updated', 'roster_size': len(PHI_MASKER)})
+
+@phi_bp.route('/phi/mask', methods=['POST'])
+def mask_messages():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    if 'messages' in data:
+        if not isinstance(data['messages'], list) or not all(isinstance(m, str) for m in data['messages']):
+            return jsonify({'error': 'messages must be a list of strings'}), 400
+        return jsonify({'masked_messages': PHI_MASKER.mask_batch(data['messages'])})
+    if not isinstance(data.get('message'), str):
+        return jsonify({'error': 'Missing message or messages'}), 400
+    return jsonify({'masked_message': PHI_MASKER.mask(data['message'])})
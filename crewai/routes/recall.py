@@ -0,0 +1,26 @@
+from datetime import date
+
+from flask import Blueprint, Response, json, request, jsonify
+
+recall_bp = Blueprint('recall', __name__)
+
+from services.recall_cohort import RECALL_INDEX, DEFAULT_BATCH_SIZE
+
+@recall_bp.route('/recall/due', methods=['GET'])
+def recall_due():
+    as_of = request.args.get('as_of', date.today().isoformat())
+    try:
+        window_days = int(request.args.get('window_days', 0))
+        batch_size = int(request.args.get('batch_size', DEFAULT_BATCH_SIZE))
+        batches = list(RECALL_INDEX.reminder_batches(as_of, window_days, batch_size))
+    except ValueError:
+        return jsonify({'error': 'Invalid as_of, window_days or batch_size'}), 400
+    if request.args.get('format') == 'jsonl':
+        # One reminder payload per line, ready for `run_sharded <file>`
+        lines = (json.dumps(payload) + '\n' for batch in batches for payload in batch)
+        return Response(''.join(lines), mimetype='application/x-ndjson')
+    return jsonify({
+        'as_of': as_of,
+        'total_candidates': sum(len(batch) for batch in batches),
+        'batches': batches,
+    })
@@ -0,0 +1,28 @@
+from flask import Blueprint, request, jsonify
+
+replies_bp = Blueprint('replies', __name__)
+
+from routes.scheduling import APPOINTMENTS
+from services.recall_cohort import RECALL_INDEX
+from services.reply_classifier import process_replies
+from services.reply_escalation import REPLY_ESCALATIONS
+
+@replies_bp.route('/replies', methods=['POST'])
+def inbound_replies():
+    # Accepts a Twilio webhook (form fields From/Body), a single JSON reply,
+    # or a JSON batch: {"replies": [{"from": ..., "body": ..., "appointment_id": ...}]}
+    if request.form:
+        replies = [{'from': request.form.get('From'), 'body': request.form.get('Body', '')}]
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+        replies = data.get('replies', [data])
+        if not isinstance(replies, list) or not all(isinstance(reply, dict) for reply in replies):
+            return jsonify({'error': 'replies must be a list of objects'}), 400
+        if any(isinstance(reply.get('appointment_id'), (list, dict)) for reply in replies):
+            return jsonify({'error': 'Invalid appointment_id'}), 400
+    # Classification and updates happen inline; escalations are answered in the background
+    summary = process_replies(replies, APPOINTMENTS, REPLY_ESCALATIONS.submit,
+                              on_update=RECALL_INDEX.update_appointment)
+    return jsonify(summary)
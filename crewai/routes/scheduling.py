@@ -3,16 +3,21 @@ from flask import Blueprint, request, jsonify
 
 scheduling_bp = Blueprint('scheduling', __name__)
 
+from services.phi_masking import PHI_MASKER
+from services.recall_cohort import RECALL_INDEX
+
 # In-memory store for demo (replace with DB later)
 APPOINTMENTS = []
 
 @scheduling_bp.route('/schedule', methods=['POST'])
 def schedule_appointment():
-    data = request.json
+    data = request.get_json(silent=True)
     # Basic validation
     required = ['patient_name', 'date', 'time']
-    if not all(k in data for k in required):
+    if not isinstance(data, dict) or not all(k in data for k in required):
         return jsonify({'error': 'Missing required fields'}), 400
+    if isinstance(data['patient_name'], (list, dict)) or isinstance(data.get('patient_id'), (list, dict)):
+        return jsonify({'error': 'Invalid patient_name or patient_id'}), 400
     try:
         # Validate date/time
         from datetime import datetime
@@ -22,11 +27,18 @@ def schedule_appointment():
     appt = {
         'id': len(APPOINTMENTS) + 1,
         'patient_name': data['patient_name'],
+        'patient_id': data.get('patient_id', ''),
+        'patient_phone': data.get('patient_phone', ''),
+        'practice_id': data.get('practice_id', 'default'),
         'date': data['date'],
         'time': data['time'],
         'notes': data.get('notes', ''),
+        'status': 'SCHEDULED',
     }
+    # Names are masked from the moment the appointment exists
+    PHI_MASKER.add_patient(appt['patient_id'] or appt['patient_name'], appt['patient_name'])
     APPOINTMENTS.append(appt)
+    RECALL_INDEX.add_appointment(appt)
     return jsonify({'status': 'scheduled', 'appointment': appt}), 201
 
 @scheduling_bp.route('/schedule', methods=['GET'])
@@ -0,0 +1,53 @@
+# services/compression.py
+# Response compression for large payloads. Picks brotli or gzip from the
+# request's Accept-Encoding and only compresses bodies above a size threshold.
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/javascript', 'text/html', 'text/plain', 'text/csv'}
+
+
+def available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def compress_body(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(data, quality=DEFAULT_BROTLI_QUALITY if level is None else level)
+    return gzip.compress(data, compresslevel=DEFAULT_GZIP_LEVEL if level is None else level, mtime=0)
+
+
+def init_compression(app):
+    """Compress responses of at least COMPRESS_MIN_SIZE bytes (config, default 1 KiB)."""
+    app.config.setdefault('COMPRESS_MIN_SIZE', DEFAULT_MIN_SIZE)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+        response.set_data(compress_body(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
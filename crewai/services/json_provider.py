@@ -0,0 +1,63 @@
+# services/json_provider.py
+# Fast JSON provider for the Flask app. Uses orjson when it is installed and
+# falls back to Flask's standard-library provider otherwise.
+
+import re
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# orjson decodes integers outside the 64-bit range as floats. Any run of 19 or
+# more digits might be one, so such documents are decoded by the standard library.
+LONG_DIGITS = re.compile(r'\d{19}')
+LONG_DIGITS_BYTES = re.compile(rb'\d{19}')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson-backed drop-in for DefaultJSONProvider.
+
+    Dates, dataclasses and other non-native types still go through Flask's
+    `default`, so responses decode to the same values as with the standard
+    library, but the bytes differ: orjson writes non-ASCII text as raw UTF-8
+    where the standard library emits \\uXXXX escapes. Values orjson cannot
+    encode (integers beyond 64 bits) are serialized by the standard library,
+    and documents that may contain them are decoded by it.
+    Pretty-printed output (debug mode, or an explicit `indent`) uses the
+    standard library.
+    """
+
+    def _orjson_options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or 'indent' in kwargs or 'cls' in kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=kwargs.get('default', self.default),
+                                option=self._orjson_options()).decode()
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        if (LONG_DIGITS if isinstance(s, str) else LONG_DIGITS_BYTES).search(s):
+            return super().loads(s)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._orjson_options() | orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
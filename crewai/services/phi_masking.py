@@ -0,0 +1,249 @@
+# services/phi_masking.py
+# PHI masking for outbound messages. Patient and provider names from the roster
+# are compiled into one Aho-Corasick automaton, so masking a message is a single
+# linear scan no matter how many names are on the roster.
+
+import threading
+from collections import deque
+
+PATIENT_TOKEN = '[PATIENT]'
+PROVIDER_TOKEN = '[PROVIDER]'
+# A name shared by a patient and a provider is masked as the patient
+TOKEN_PRIORITY = (PATIENT_TOKEN, PROVIDER_TOKEN)
+
+
+def _lower(text):
+    """Lowercase without changing string length, so match offsets stay valid."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(c.lower()[0] for c in text)
+
+
+def _token_for(owners):
+    return min(owners.values(), key=TOKEN_PRIORITY.index)
+
+
+def provider_variants(name):
+    """Forms a provider name appears in: 'Jane Smith', 'Dr. Smith', 'Dr Smith'."""
+    parts = name.replace('Dr.', '').replace('Dr ', '').split()
+    variants = {name}
+    if parts:
+        variants.update({f"Dr. {parts[-1]}", f"Dr {parts[-1]}", ' '.join(parts)})
+    return variants
+
+
+class NameAutomaton:
+    """Aho-Corasick automaton over roster names, updated in place as the roster changes.
+
+    The first scan links the whole trie once. After that, adding a name links
+    only its new nodes and the existing nodes that must now fail to them, found
+    by walking the failure tree below the new node's parent; removing a name
+    clears its terminal mark and refreshes the dictionary links below it. Nodes
+    are never deleted, and the roster is never re-linked from scratch.
+    """
+
+    def __init__(self):
+        self._goto = [{}]      # node -> {char: node}
+        self._depth = [0]
+        self._term = [None]    # node -> token if a name ends here
+        self._fail = [0]
+        self._dict = [0]       # node -> nearest proper suffix that is a whole name
+        self._fail_children = {}   # node -> nodes whose failure link points at it (root omitted)
+        self._linked = False
+
+    def add(self, name, token):
+        """Add `name`, or change the token of a name already present."""
+        node, created = 0, []
+        for ch in _lower(name):
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._depth.append(self._depth[node] + 1)
+                self._term.append(None)
+                self._fail.append(0)
+                self._dict.append(0)
+                created.append((node, ch, nxt))
+            node = nxt
+        was_name = self._term[node] is not None
+        self._term[node] = token
+        if not self._linked:
+            return
+        if created and created[0][0] == 0:
+            # A first character never seen before: every node may now fail to it
+            self._link()
+            return
+        for parent, ch, child in created:
+            self._link_new(parent, ch, child)
+        if not was_name:
+            self._refresh_dict(node)
+
+    def remove(self, name):
+        node = 0
+        for ch in _lower(name):
+            node = self._goto[node].get(ch)
+            if node is None:
+                return
+        if self._term[node] is None:
+            return
+        self._term[node] = None
+        if self._linked:
+            self._refresh_dict(node)
+
+    def _set_fail(self, node, target):
+        old = self._fail[node]
+        if old:
+            self._fail_children[old].discard(node)
+        self._fail[node] = target
+        if target:
+            self._fail_children.setdefault(target, set()).add(node)
+
+    def _refresh_dict(self, node, include_self=False):
+        """Recompute dictionary links for the failure-tree subtree under `node`."""
+        stack = [node] if include_self else list(self._fail_children.get(node, ()))
+        while stack:
+            x = stack.pop()
+            f = self._fail[x]
+            self._dict[x] = f if self._term[f] is not None else self._dict[f]
+            stack.extend(self._fail_children.get(x, ()))
+
+    def _link_new(self, parent, ch, child):
+        f = self._fail[parent]
+        while f and ch not in self._goto[f]:
+            f = self._fail[f]
+        target = self._goto[f].get(ch, 0)
+        self._set_fail(child, target)
+        self._dict[child] = target if self._term[target] is not None else self._dict[target]
+        # Existing nodes u+ch, where u ends with parent's string, now fail to child.
+        # Below a u that already has a ch edge, nodes fail into that edge instead.
+        stack = list(self._fail_children.get(parent, ()))
+        while stack:
+            u = stack.pop()
+            v = self._goto[u].get(ch)
+            if v is None:
+                stack.extend(self._fail_children.get(u, ()))
+            elif self._depth[self._fail[v]] < self._depth[child]:
+                self._set_fail(v, child)
+                self._refresh_dict(v, include_self=True)
+
+    def _link(self):
+        self._fail_children = {}
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            fail = self._fail[node]
+            self._dict[node] = fail if self._term[fail] is not None else self._dict[fail]
+            for ch, child in self._goto[node].items():
+                f = fail
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                target = target if target != child else 0
+                self._fail[child] = target
+                if target:
+                    self._fail_children.setdefault(target, set()).add(child)
+                queue.append(child)
+        self._linked = True
+
+    def matches(self, text):
+        """(start, end, token) for every roster name occurring in `text`."""
+        if not self._linked:
+            self._link()
+        goto, fail, term, depth, dict_link = self._goto, self._fail, self._term, self._depth, self._dict
+        node = 0
+        found = []
+        for i, ch in enumerate(_lower(text)):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = node if term[node] is not None else dict_link[node]
+            while hit:
+                found.append((i + 1 - depth[hit], i + 1, term[hit]))
+                hit = dict_link[hit]
+        return found
+
+
+def _is_boundary(text, i):
+    return i < 0 or i >= len(text) or not text[i].isalnum()
+
+
+class PHIMasker:
+    """Roster-backed masker producing `masked_message` for outbound reminders.
+
+    Safe to share between request threads: roster changes and scans hold one lock.
+    """
+
+    def __init__(self):
+        self._automaton = NameAutomaton()
+        self._refs = {}        # lowercased name -> {entity key: token}
+        self._entities = {}    # entity key -> set of names
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entities)
+
+    def _add_entity(self, key, names, token):
+        names = {name for name in names if name.strip()}
+        with self._lock:
+            self._remove(key)
+            self._entities[key] = names
+            for name in names:
+                owners = self._refs.setdefault(_lower(name), {})
+                owners[key] = token
+                self._automaton.add(name, _token_for(owners))
+
+    def add_patient(self, patient_id, name):
+        self._add_entity(('patient', str(patient_id)), {str(name)}, PATIENT_TOKEN)
+
+    def add_provider(self, provider_id, name):
+        self._add_entity(('provider', str(provider_id)), provider_variants(str(name)), PROVIDER_TOKEN)
+
+    def _remove(self, key):
+        for name in self._entities.pop(key, ()):
+            owners = self._refs.get(_lower(name), {})
+            owners.pop(key, None)
+            if owners:
+                self._automaton.add(name, _token_for(owners))
+            else:
+                self._refs.pop(_lower(name), None)
+                self._automaton.remove(name)
+
+    def remove(self, key):
+        """Drop an entity, e.g. ('patient', 'PAT-2025-001'); shared names keep their other owners' token."""
+        kind, entity_id = key
+        with self._lock:
+            self._remove((kind, str(entity_id)))
+
+    def mask(self, message):
+        """Replace every whole-word roster name in `message` with its token."""
+        spans = []
+        last_end = 0
+        # Leftmost-longest, non-overlapping, whole words only
+        with self._lock:
+            found = self._automaton.matches(message)
+        for start, end, token in sorted(found, key=lambda m: (m[0], -m[1])):
+            if start < last_end or not (_is_boundary(message, start - 1) and _is_boundary(message, end)):
+                continue
+            spans.append((start, end, token))
+            last_end = end
+        if not spans:
+            return message
+        parts, pos = [], 0
+        for start, end, token in spans:
+            parts.append(message[pos:start])
+            parts.append(token)
+            pos = end
+        parts.append(message[pos:])
+        return ''.join(parts)
+
+    def mask_batch(self, messages):
+        return [self.mask(message) for message in messages]
+
+
+# Shared masker fed by the scheduling and roster routes
+PHI_MASKER = PHIMasker()
@@ -0,0 +1,171 @@
+# services/recall_cohort.py
+# Recall cohort engine: finds patients who are overdue (or coming due) for their
+# six-month hygiene recall and hands them to the reminder pipeline in batches.
+
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+
+RECALL_INTERVAL_DAYS = 182
+CANCELLED_STATUS = 'CANCELLED'
+DEFAULT_BATCH_SIZE = 50
+
+# Recall reminders go out mid-morning on the day the batch is built, inside the
+# 8am-6pm window the compliance checks enforce
+RECALL_SEND_TIME = '10:00:00'
+
+RECALL_TEMPLATE = (
+    "Hi! It's time to book your six-month checkup at [PRACTICE_NAME]. "
+    "Reply CONFIRM or visit [RESCHEDULE_LINK]"
+)
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def _is_cancelled(appt):
+    return appt.get('status') == CANCELLED_STATUS
+
+
+class RecallCohortIndex:
+    """Index of each patient's most recent appointment, ordered by recall due date.
+
+    Only the latest appointment per patient matters: a patient who has already
+    rebooked has a future appointment, which pushes their due date out of every
+    overdue window without any special casing. Cancelled appointments never
+    count as the latest visit. Queries are two bisects over a sorted list, so
+    finding a cohort never rescans the appointment history. All methods hold
+    one lock, so the shared index can be fed from request threads.
+    """
+
+    def __init__(self, interval_days=RECALL_INTERVAL_DAYS):
+        self.interval = timedelta(days=interval_days)
+        self._visits = {}     # (practice_id, patient) -> appointments
+        self._latest = {}     # (practice_id, patient) -> (date, appointment)
+        self._due = []        # sorted (due_date, (practice_id, patient))
+        self._anonymous = {}  # (practice_id, lowercased name) -> opaque patient id
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._latest)
+
+    def clear(self):
+        """Forget every indexed appointment."""
+        with self._lock:
+            self._visits, self._latest, self._due, self._anonymous = {}, {}, [], {}
+
+    def _patient_key(self, appt, create=True):
+        # Same-named patients at different practices are different patients, and
+        # ids arrive as whatever JSON type the client sent. Patients without an
+        # id get an opaque one, so their name never leaves in a payload.
+        practice_id = str(appt.get('practice_id') or 'default')
+        patient_id = appt.get('patient_id')
+        if not patient_id:
+            name = (practice_id, str(appt.get('patient_name', '')).strip().lower())
+            if name not in self._anonymous and not create:
+                return None
+            patient_id = self._anonymous.setdefault(name, f"ANON-{len(self._anonymous) + 1:06d}")
+        return (practice_id, str(patient_id))
+
+    def _latest_visit(self, key):
+        latest = None
+        for appt in self._visits.get(key, ()):
+            if _is_cancelled(appt):
+                continue
+            visit = _parse_date(appt['date'])
+            if latest is None or visit >= latest[0]:
+                latest = (visit, appt)
+        return latest
+
+    def _reindex(self, key):
+        current = self._latest.get(key)
+        latest = self._latest_visit(key)
+        if current is not None:
+            if latest is not None and latest[0] == current[0]:
+                self._latest[key] = latest
+                return
+            del self._due[bisect_left(self._due, (current[0] + self.interval, key))]
+            del self._latest[key]
+        if latest is not None:
+            self._latest[key] = latest
+            insort(self._due, (latest[0] + self.interval, key))
+
+    def add_appointment(self, appt):
+        """Record one appointment, updating the patient's due date if it is newer."""
+        with self._lock:
+            key = self._patient_key(appt)
+            self._visits.setdefault(key, []).append(appt)
+            self._reindex(key)
+
+    def update_appointment(self, appt):
+        """Re-evaluate a recorded appointment's patient after its status changed, e.g. a cancellation."""
+        with self._lock:
+            key = self._patient_key(appt, create=False)
+            if key in self._visits:
+                self._reindex(key)
+
+    def load(self, appointments):
+        """Bulk-load a full appointment history with a single sort."""
+        with self._lock:
+            for appt in appointments:
+                self._visits.setdefault(self._patient_key(appt), []).append(appt)
+            self._latest = {}
+            for key in self._visits:
+                latest = self._latest_visit(key)
+                if latest is not None:
+                    self._latest[key] = latest
+            self._due = sorted((visit + self.interval, key) for key, (visit, _) in self._latest.items())
+
+    def due_between(self, start, end):
+        """(practice_id, patient) keys whose recall falls due in [start, end], most overdue first."""
+        lo_key, hi_key = (_parse_date(start),), (_parse_date(end) + timedelta(days=1),)
+        with self._lock:
+            return [key for _, key in self._due[bisect_left(self._due, lo_key):bisect_left(self._due, hi_key)]]
+
+    def overdue(self, as_of, window_days=0):
+        """Patients overdue as of `as_of`, plus those coming due within `window_days`."""
+        end = _parse_date(as_of) + timedelta(days=window_days + 1)
+        with self._lock:
+            return [key for _, key in self._due[:bisect_left(self._due, (end,))]]
+
+    def candidate(self, key, as_of):
+        """Build a run_with_trigger payload for one patient.
+
+        There is no appointment yet, so `appointment_datetime` is the recall due
+        date and `delivery_time` is RECALL_SEND_TIME on the `as_of` day.
+        """
+        with self._lock:
+            visit, appt = self._latest[key]
+        practice_id, patient = key
+        due = visit + self.interval
+        return {
+            'patient_id': patient,
+            'patient_phone': appt.get('patient_phone', ''),
+            'practice_id': practice_id,
+            'appointment_id': f"RECALL-{practice_id}-{patient}",
+            'reminder_type': 'recall',
+            'message_content': RECALL_TEMPLATE,
+            'delivery_time': f"{_parse_date(as_of).isoformat()} {RECALL_SEND_TIME}",
+            'appointment_datetime': f"{due.isoformat()} {RECALL_SEND_TIME}",
+            'last_visit': visit.isoformat(),
+            'due_date': due.isoformat(),
+            'days_overdue': (_parse_date(as_of) - due).days,
+        }
+
+    def reminder_batches(self, as_of, window_days=0, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield prioritized batches of reminder payloads, most overdue first."""
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        with self._lock:
+            payloads = [self.candidate(key, as_of) for key in self.overdue(as_of, window_days)]
+        for i in range(0, len(payloads), batch_size):
+            yield payloads[i:i + batch_size]
+
+
+# Shared index fed by the scheduling routes
+RECALL_INDEX = RecallCohortIndex()
@@ -10,3 +10,26 @@ def suggest_appointment(patient_name: str, history=None):
         'suggested_time': '10:00',
         'message': f"Hi {patient_name}, our AI suggests 10:00 AM tomorrow for your appointment. Does that work?"
     }
+
+_reply_crew = None
+
+
+def classify_reply(text: str):
+    # Escalate a free-text reply to the crew's Dental Scheduler agent, through the
+    # shared LLM governor. Returns one of CONFIRM, CANCEL, RESCHEDULE, STOP, or
+    # None to leave the reply for staff review (also when the provider is
+    # throttling, the circuit breaker is open or the crew is not installed).
+    # Called from the single escalation worker, so one crew is reused.
+    global _reply_crew
+    try:
+        from dental_recall_crew.crew import DentalRecallCrew
+    except ImportError as e:
+        print(f"[AI] Reply escalation unavailable: {e}")
+        return None
+    try:
+        if _reply_crew is None:
+            _reply_crew = DentalRecallCrew()
+        return _reply_crew.classify_reply(text)
+    except Exception as e:
+        print(f"[AI] Reply escalation failed: {type(e).__name__}: {e}")
+        return None
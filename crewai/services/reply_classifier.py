@@ -0,0 +1,193 @@
+# services/reply_classifier.py
+# Keyword/regex classifier for inbound patient replies to reminders.
+# Replies stream through normalize -> classify -> batched status update; only
+# replies no pattern recognises are escalated to the AI agent, and every
+# escalation is recorded on the appointment until it is settled.
+
+import re
+import unicodedata
+from itertools import islice
+
+CONFIRM = 'CONFIRM'
+CANCEL = 'CANCEL'
+RESCHEDULE = 'RESCHEDULE'
+STOP = 'STOP'
+UNKNOWN = 'UNKNOWN'
+
+# Highest priority first: "yes but can we move it" is a reschedule, and an
+# opt-out always wins.
+INTENT_PRIORITY = (STOP, CANCEL, RESCHEDULE, CONFIRM)
+
+# Whole-message replies resolved with a dict lookup before any regex runs
+EXACT_REPLIES = {
+    'confirm': CONFIRM, 'confirmed': CONFIRM, 'c': CONFIRM, 'y': CONFIRM, 'yes': CONFIRM,
+    'ok': CONFIRM, 'okay': CONFIRM, 'si': CONFIRM,
+    'cancel': CANCEL, 'x': CANCEL,
+    'reschedule': RESCHEDULE, 'r': RESCHEDULE,
+    'stop': STOP, 'stopall': STOP, 'unsubscribe': STOP, 'please stop': STOP, 'stop please': STOP,
+}
+
+CONFIRM_WORDS = r"(?:confirm\w*|yes|yep|yeah|yup|sure|ok|okay|sounds good|see you|will be there|i ll be there)"
+CANCEL_WORDS = r"(?:cancel\w*)"
+RESCHEDULE_WORDS = r"(?:re ?schedul\w*|re ?book\w*|move|change|postpone\w*)"
+
+INTENT_PATTERNS = {
+    # Opting out needs explicit phrasing: "I will stop by at 10" is not a STOP
+    STOP: r"\b(?:stop (?:texting|messaging|sending|contacting|these|this|all|the (?:texts|messages|reminders))|"
+          r"unsubscribe|opt ?out|no more (?:texts|messages|reminders)|"
+          r"(?:do not|don ?t) (?:text|message|contact))\b",
+    CANCEL: rf"\b(?:{CANCEL_WORDS}|(?:can ?not|can ?t|won ?t|unable to) (?:make|come|attend|be there)|"
+            r"not (?:coming|going to make))\b",
+    RESCHEDULE: rf"\b(?:{RESCHEDULE_WORDS}|push (?:it )?back|"
+                r"(?:another|different|other|new) (?:day|date|time)|later (?:day|date|time))\b",
+    CONFIRM: rf"\b{CONFIRM_WORDS}\b",
+}
+
+# "don't cancel", "no need to reschedule", "can't confirm", "not sure": a negated
+# intent word is not that intent. The group is tried before the intents, so it
+# consumes the word and "Please don't cancel, I'll be there" is a CONFIRM.
+NEGATED = (r"\b(?:no|not|never|do not|don ?t|can ?not|can ?t|won ?t|isn ?t)"
+           r"(?: (?:really|quite|totally|fully|yet|say|please|you|need to|want to|have to|able to|"
+           r"be able to|going to))? "
+           rf"(?:{CANCEL_WORDS}|{RESCHEDULE_WORDS}|stop\w*|unsubscribe|{CONFIRM_WORDS})\b")
+
+# One alternation with a named group per intent: a single scan finds every intent
+_CLASSIFIER = re.compile('|'.join(
+    f"(?P<{name}>{pattern})" for name, pattern in [('NEGATED', NEGATED), *INTENT_PATTERNS.items()]
+))
+# A trailing question mark, ignoring emoji and other punctuation after it
+_QUESTION = re.compile(r"\?[^\w]*$")
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+STATUS_BY_INTENT = {
+    CONFIRM: 'CONFIRMED',
+    CANCEL: 'CANCELLED',
+    RESCHEDULE: 'RESCHEDULE_REQUESTED',
+}
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def normalize_text(text):
+    """Lowercase, strip accents, punctuation and emoji, and collapse whitespace."""
+    text = unicodedata.normalize('NFKD', '' if text is None else str(text))
+    text = text.encode('ascii', 'ignore').decode('ascii').lower()
+    text = _NON_WORD.sub(' ', text)
+    return _SPACES.sub(' ', text).strip()
+
+
+def is_question(text):
+    return bool(_QUESTION.search('' if text is None else str(text)))
+
+
+def classify_text(normalized, question=False):
+    """Classify normalized reply text; returns UNKNOWN when nothing matches.
+
+    Questions ("Is it ok to bring my kid?") are UNKNOWN unless they opt out or
+    cancel, so the agent or staff can answer them.
+    """
+    intent = EXACT_REPLIES.get(normalized)
+    if intent is None:
+        found = {m.lastgroup for m in _CLASSIFIER.finditer(normalized)}
+        intent = next((i for i in INTENT_PRIORITY if i in found), UNKNOWN)
+    if question and intent not in (STOP, CANCEL):
+        return UNKNOWN
+    return intent
+
+
+def normalize_phone(phone):
+    phone = ('' if phone is None else str(phone)).strip()
+    return phone[len('whatsapp:'):] if phone.startswith('whatsapp:') else phone
+
+
+def normalized(replies):
+    for reply in replies:
+        body = reply.get('body')
+        body = '' if body is None else str(body)
+        yield {
+            'from': normalize_phone(reply.get('from')),
+            'appointment_id': reply.get('appointment_id'),
+            'body': body,
+            'text': normalize_text(body),
+            'question': is_question(body),
+        }
+
+
+def classified(replies):
+    for reply in replies:
+        reply['intent'] = classify_text(reply['text'], reply['question'])
+        yield reply
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def apply_intent(appt, intent):
+    if intent == STOP:
+        appt['opted_out'] = True
+    else:
+        appt['status'] = STATUS_BY_INTENT[intent]
+    appt['patient_response'] = intent
+
+
+def resolve_escalation(appt, entry, intent, on_update=None):
+    """Record the agent's answer for an escalated reply and apply it to the appointment."""
+    entry['intent'] = intent
+    if intent:
+        apply_intent(appt, intent)
+        if on_update is not None:
+            on_update(appt)
+    _flag_review(appt)
+
+
+def _flag_review(appt):
+    appt['needs_review'] = any(e['intent'] is None for e in appt.get('escalated_replies', ()))
+
+
+def process_replies(replies, appointments, escalate, batch_size=DEFAULT_BATCH_SIZE, on_update=None):
+    """Stream replies through the classifier and update matching appointments in bulk.
+
+    Replies are matched to an appointment by `appointment_id` when given,
+    otherwise to the patient's most recent appointment by phone. Unclassified
+    replies that match an appointment are recorded in the appointment's
+    `escalated_replies` and passed to `escalate(appt, entry)`. It may return
+    one of the intents; None leaves the entry pending (`needs_review`) for a
+    background worker or staff to settle with resolve_escalation().
+    `on_update(appt)` is called for every appointment whose status changed.
+    """
+    by_id = {appt['id']: appt for appt in appointments}
+    by_phone = {appt['patient_phone']: appt for appt in appointments if appt.get('patient_phone')}
+    summary = {'processed': 0, 'updated': 0, 'escalated': 0, 'unmatched': 0, 'escalations': [],
+               'counts': {intent: 0 for intent in INTENT_PRIORITY + (UNKNOWN,)}}
+
+    for batch in batched(classified(normalized(replies)), batch_size):
+        updates = []
+        for reply in batch:
+            appt = by_id.get(reply['appointment_id']) or by_phone.get(reply['from'])
+            if appt is None:
+                summary['unmatched'] += 1
+            elif reply['intent'] == UNKNOWN:
+                entry = {'body': reply['body'], 'intent': None}
+                appt.setdefault('escalated_replies', []).append(entry)
+                entry['intent'] = intent = escalate(appt, entry)
+                _flag_review(appt)
+                reply['intent'] = intent or UNKNOWN
+                summary['escalated'] += 1
+                summary['escalations'].append({'appointment_id': appt['id'], 'intent': reply['intent']})
+            summary['counts'][reply['intent']] += 1
+            if appt is not None and reply['intent'] != UNKNOWN:
+                updates.append((appt, reply['intent']))
+        for appt, intent in updates:
+            apply_intent(appt, intent)
+            if on_update is not None:
+                on_update(appt)
+        summary['updated'] += len(updates)
+        summary['processed'] += len(batch)
+    return summary
@@ -0,0 +1,51 @@
+# services/reply_escalation.py
+# Background escalation of replies the keyword classifier cannot place. The
+# webhook only records and enqueues them; one worker thread asks the AI agent
+# and applies its answer, so a slow or rate-limited provider never holds the
+# inbound request past Twilio's webhook timeout.
+
+import queue
+import threading
+
+from services.recall_cohort import RECALL_INDEX
+from services.recallshield_ai import classify_reply
+from services.reply_classifier import resolve_escalation
+
+
+class EscalationQueue:
+    """FIFO of escalated replies drained by a single daemon worker thread."""
+
+    def __init__(self, classify, on_update=None):
+        self._classify = classify
+        self._on_update = on_update
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def submit(self, appt, entry):
+        """Queue an escalated reply; returns None so it stays pending until the worker answers."""
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='reply-escalation', daemon=True)
+                self._worker.start()
+        self._queue.put((appt, entry))
+        return None
+
+    def join(self):
+        """Block until every queued reply has been handled."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            appt, entry = self._queue.get()
+            try:
+                resolve_escalation(appt, entry, self._classify(entry['body']), self._on_update)
+            finally:
+                self._queue.task_done()
+
+
+# Shared queue fed by the replies webhook
+REPLY_ESCALATIONS = EscalationQueue(classify_reply, on_update=RECALL_INDEX.update_appointment)
@@ -0,0 +1,18 @@
+"""
+Pytest configuration and fixtures for the Flask backend tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def appointments():
+    """Provide scheduled appointments the replies can match"""
+    return [
+        {'id': 1, 'patient_phone': '+15125550100', 'status': 'SCHEDULED'},
+        {'id': 2, 'patient_phone': '+15125550101', 'status': 'SCHEDULED'},
+    ]
@@ -0,0 +1,80 @@
+"""
+Tests for response compression
+"""
+import gzip
+
+import pytest
+from flask import Flask, Response
+from services import compression
+from services.compression import init_compression
+
+BODY = 'x' * 2048
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config['COMPRESS_MIN_SIZE'] = 1024
+    init_compression(app)
+
+    @app.get('/large')
+    def large():
+        return Response(BODY, mimetype='text/plain')
+
+    @app.get('/small')
+    def small():
+        return Response('x' * 100, mimetype='text/plain')
+
+    @app.get('/image')
+    def image():
+        return Response(b'\x89PNG' * 1024, mimetype='image/png')
+
+    @app.get('/stream')
+    def stream():
+        return Response((BODY for _ in range(3)), mimetype='text/plain')
+
+    @app.get('/status/<int:code>')
+    def status(code):
+        return Response(BODY, status=code, mimetype='text/plain')
+
+    return app.test_client()
+
+
+class TestCompression:
+    """Test the size threshold, encoding negotiation and skipped responses"""
+
+    def test_large_body_is_gzipped(self, client, monkeypatch):
+        """Test that bodies over the threshold are compressed with gzip"""
+        monkeypatch.setattr(compression, 'brotli', None)
+        response = client.get('/large', headers={'Accept-Encoding': 'br, gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.get_data()).decode() == BODY
+        assert 'Accept-Encoding' in response.headers['Vary']
+
+    def test_brotli_is_preferred(self, client):
+        """Test that brotli wins when the client and server both support it"""
+        brotli = pytest.importorskip('brotli')
+        response = client.get('/large', headers={'Accept-Encoding': 'gzip, br'})
+        assert response.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.get_data()).decode() == BODY
+
+    def test_small_body_is_not_compressed(self, client):
+        """Test that bodies under the threshold are sent as-is but still vary"""
+        response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+        assert 'Accept-Encoding' in response.headers['Vary']
+
+    @pytest.mark.parametrize('accept', ['gzip;q=0', 'identity', ''])
+    def test_refused_encodings_are_not_used(self, client, monkeypatch, accept):
+        """Test that q=0 and identity-only clients get an uncompressed body"""
+        monkeypatch.setattr(compression, 'brotli', None)
+        response = client.get('/large', headers={'Accept-Encoding': accept})
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_data().decode() == BODY
+
+    @pytest.mark.parametrize('path', ['/image', '/stream', '/status/204', '/status/304'])
+    def test_skipped_responses(self, client, path):
+        """Test that non-text, streamed and bodiless responses are left alone"""
+        response = client.get(path, headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+        assert 'Vary' not in response.headers
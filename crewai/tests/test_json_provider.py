@@ -0,0 +1,59 @@
+"""
+Tests for the orjson-backed JSON provider
+"""
+import json
+from datetime import date
+
+import pytest
+from flask import Flask
+from services.json_provider import FastJSONProvider
+
+orjson = pytest.importorskip('orjson')
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+class TestFastJSONProvider:
+    """Test value parity with the standard library and the fallback path"""
+
+    def test_values_match_stdlib(self, app):
+        """Test that non-ASCII and non-native values decode the same either way"""
+        payload = {'patient_name': 'José Muñoz', 'date': date(2025, 11, 20)}
+        fast = app.json.dumps(payload)
+        stdlib = json.dumps(payload, default=app.json.default, sort_keys=True)
+        assert 'José' in fast and '\\u00e9' in stdlib
+        assert json.loads(fast) == json.loads(stdlib)
+
+    def test_big_integers_fall_back_to_stdlib(self, app):
+        """Test that values orjson rejects are serialized instead of raising"""
+        big = {'id': 2 ** 70}
+        assert json.loads(app.json.dumps(big)) == big
+        with app.app_context():
+            response = app.json.response(big)
+        assert json.loads(response.get_data()) == big
+
+    def test_unsupported_types_still_raise(self, app):
+        """Test that the fallback does not hide genuinely unserializable values"""
+        with pytest.raises(TypeError):
+            app.json.dumps({'value': object()})
+
+    @pytest.mark.parametrize('document', ['{"id": 18446744073709551616}', b'[-9223372036854775809]',
+                                          '{"id": 123456789012345678901234567890}'])
+    def test_big_integers_decode_exactly(self, app, document):
+        """Test that integers beyond 64 bits are not decoded as floats"""
+        assert app.json.loads(document) == json.loads(document)
+
+    def test_request_body_with_big_integer(self, app):
+        """Test that request JSON goes through the same decoding"""
+        @app.post('/echo')
+        def echo():
+            from flask import request
+            return {'type': type(request.get_json()['id']).__name__}
+
+        response = app.test_client().post('/echo', data='{"id": 36893488147419103232}', content_type='application/json')
+        assert response.get_json() == {'type': 'int'}
@@ -0,0 +1,82 @@
+"""
+Tests for the load generator's statistics, baseline comparison and run setup
+"""
+import contextlib
+import io
+
+import pytest
+from loadtest import InProcessClient, compare, main, percentile, run_load, summarize
+
+
+def report(target_rps=50.0, duration_s=10.0, **overall):
+    stats = {'p50_ms': 10.0, 'p95_ms': 20.0, 'p99_ms': 30.0, 'error_rate': 0.0, 'throughput_rps': 50.0}
+    return {'target_rps': target_rps, 'duration_s': duration_s, 'overall': {**stats, **overall}}
+
+
+class TestStatistics:
+    """Test nearest-rank percentiles and per-route summaries"""
+
+    @pytest.mark.parametrize('pct, expected', [(0, 1), (50, 5), (95, 10), (99, 10), (100, 10)])
+    def test_nearest_rank_percentile(self, pct, expected):
+        """Test that percentiles pick an observed sample by nearest rank"""
+        assert percentile(list(range(1, 11)), pct) == expected
+
+    def test_percentile_of_no_samples(self):
+        """Test that an empty route reports zero latency"""
+        assert percentile([], 99) == 0.0
+
+    def test_summarize(self):
+        """Test error rate, throughput and percentiles from raw samples"""
+        samples = [{'latency_ms': ms, 'error': ms > 30} for ms in (40, 10, 20, 30)]
+        summary = summarize(samples, elapsed=2.0)
+        assert summary == {'requests': 4, 'errors': 1, 'error_rate': 0.25, 'throughput_rps': 2.0,
+                           'p50_ms': 20, 'p95_ms': 40, 'p99_ms': 40}
+
+    def test_summarize_no_samples(self):
+        """Test that an idle route does not divide by zero"""
+        assert summarize([], elapsed=0.0)['error_rate'] == 0.0
+
+
+class TestCompare:
+    """Test regression detection against a saved baseline"""
+
+    def check(self, current, baseline):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return compare(current, baseline, tolerance=0.2)
+
+    def test_within_tolerance(self):
+        """Test that small changes pass"""
+        assert self.check(report(p99_ms=35.0, throughput_rps=45.0), report())
+
+    @pytest.mark.parametrize('overall', [{'p95_ms': 25.0}, {'throughput_rps': 39.0}, {'error_rate': 0.02}])
+    def test_regressions_fail(self, overall):
+        """Test latency, throughput and absolute error-rate regressions"""
+        assert not self.check(report(**overall), report())
+
+    @pytest.mark.parametrize('baseline', [report(target_rps=100.0), report(duration_s=30.0)])
+    def test_mismatched_baseline_fails(self, baseline):
+        """Test that a baseline from a different rate or duration is not compared"""
+        assert not self.check(report(), baseline)
+
+
+class TestRunLoad:
+    """Test run setup for in-process load"""
+
+    def test_runs_start_from_the_same_state(self):
+        """Test that appointments posted by one run do not slow the next"""
+        from routes.scheduling import APPOINTMENTS
+
+        client = InProcessClient()
+        before = len(APPOINTMENTS)
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_load(client, rps=200, duration=0.2)
+            assert len(APPOINTMENTS) > before
+            client.reset()
+        assert len(APPOINTMENTS) == before
+
+    @pytest.mark.parametrize('argv', [['--rps', '0'], ['--rps', '-5'], ['--duration', '0']])
+    def test_non_positive_rate_is_rejected(self, argv):
+        """Test that a zero or negative rate is a usage error, not a ZeroDivisionError"""
+        with pytest.raises(SystemExit) as exc, contextlib.redirect_stderr(io.StringIO()):
+            main(argv)
+        assert exc.value.code == 2
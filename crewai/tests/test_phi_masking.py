@@ -0,0 +1,181 @@
+"""
+Tests for roster-backed PHI masking
+"""
+import random
+import threading
+
+import pytest
+from services.phi_masking import PATIENT_TOKEN, PROVIDER_TOKEN, NameAutomaton, PHIMasker, provider_variants
+
+
+@pytest.fixture
+def masker():
+    masker = PHIMasker()
+    masker.add_patient('PAT-1', 'Jane Smith')
+    masker.add_patient('PAT-2', 'Ann')
+    masker.add_provider('PROV-1', 'Dr. Wei Chen')
+    return masker
+
+
+def relinked(automaton):
+    """A copy of the automaton's trie linked from scratch"""
+    fresh = NameAutomaton()
+    fresh._goto = [dict(edges) for edges in automaton._goto]
+    fresh._depth = list(automaton._depth)
+    fresh._term = list(automaton._term)
+    fresh._fail = [0] * len(automaton._goto)
+    fresh._dict = [0] * len(automaton._goto)
+    fresh._link()
+    return fresh
+
+
+class TestPHIMasker:
+    """Test masking rules and roster changes"""
+
+    def test_whole_words_only(self, masker):
+        """Test that names inside other words are left alone"""
+        assert masker.mask('Hi Ann, see Annabel and Joanne') == 'Hi [PATIENT], see Annabel and Joanne'
+        assert masker.mask('ann.') == '[PATIENT].'
+
+    def test_leftmost_longest(self, masker):
+        """Test that the longest name starting first wins over names inside it"""
+        masker.add_patient('PAT-3', 'Jane')
+        assert masker.mask('Jane Smith and Jane') == '[PATIENT] and [PATIENT]'
+        masker.add_patient('PAT-4', 'Smith Ann')
+        assert masker.mask('Jane Smith Ann') == '[PATIENT] [PATIENT]'
+
+    def test_provider_variants(self, masker):
+        """Test that providers are masked by full name and by title"""
+        assert provider_variants('Dr. Wei Chen') == {'Dr. Wei Chen', 'Dr. Chen', 'Dr Chen', 'Wei Chen'}
+        assert masker.mask('Dr. Chen, Dr Chen and Wei Chen') == f"{PROVIDER_TOKEN}, {PROVIDER_TOKEN} and {PROVIDER_TOKEN}"
+
+    def test_shared_name_keeps_remaining_owner_token(self, masker):
+        """Test that removing one owner of a shared name recomputes its token"""
+        masker.add_provider('PROV-2', 'Jane Smith')
+        assert masker.mask('Jane Smith') == PATIENT_TOKEN
+        masker.remove(('patient', 'PAT-1'))
+        assert masker.mask('Jane Smith, Dr. Smith') == f"{PROVIDER_TOKEN}, {PROVIDER_TOKEN}"
+        masker.add_patient('PAT-1', 'Jane Smith')
+        masker.remove(('provider', 'PROV-2'))
+        assert masker.mask('Jane Smith, Dr. Smith') == f"{PATIENT_TOKEN}, Dr. Smith"
+        masker.remove(('patient', 'PAT-1'))
+        assert masker.mask('Jane Smith') == 'Jane Smith'
+
+    def test_renaming_a_patient_replaces_the_old_name(self, masker):
+        """Test that re-adding a key drops its previous names"""
+        masker.add_patient('PAT-2', 'Annie')
+        assert masker.mask('Ann and Annie') == f"Ann and {PATIENT_TOKEN}"
+
+    def test_concurrent_roster_changes_and_masking(self, masker):
+        """Test that masking stays consistent while another thread edits the roster"""
+        errors = []
+
+        def edit():
+            for i in range(500):
+                masker.add_patient(f"TMP-{i}", f"Temp Patient{i}")
+                masker.remove(('patient', f"TMP-{i}"))
+
+        def scan():
+            for _ in range(500):
+                if masker.mask('Jane Smith saw Dr. Chen') != f"{PATIENT_TOKEN} saw {PROVIDER_TOKEN}":
+                    errors.append(1)
+
+        threads = [threading.Thread(target=edit), threading.Thread(target=scan)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+
+
+class TestNameAutomaton:
+    """Test incremental linking against a full relink"""
+
+    def test_incremental_links_match_full_relink(self):
+        """Test that in-place adds and removes leave the same links as a rebuild"""
+        rng = random.Random(0)
+        automaton = NameAutomaton()
+        names = set()
+        for _ in range(5):
+            name = ''.join(rng.choice('ab ') for _ in range(4))
+            automaton.add(name, PATIENT_TOKEN)
+            names.add(name)
+        automaton.matches('')
+        for _ in range(300):
+            if names and rng.random() < 0.3:
+                name = rng.choice(sorted(names))
+                automaton.remove(name)
+                names.discard(name)
+            else:
+                name = ''.join(rng.choice('ab ') for _ in range(rng.randint(1, 7)))
+                automaton.add(name, PATIENT_TOKEN)
+                names.add(name)
+            fresh = relinked(automaton)
+            assert automaton._fail == fresh._fail
+            assert automaton._dict == fresh._dict
+
+
+class TestRoutes:
+    """Test that malformed scheduling and roster payloads never half-apply"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from flask import Flask
+        from routes import phi, scheduling
+        from services.recall_cohort import RecallCohortIndex
+
+        masker, appointments = PHIMasker(), []
+        monkeypatch.setattr(phi, 'PHI_MASKER', masker)
+        monkeypatch.setattr(scheduling, 'PHI_MASKER', masker)
+        monkeypatch.setattr(scheduling, 'APPOINTMENTS', appointments)
+        monkeypatch.setattr(scheduling, 'RECALL_INDEX', RecallCohortIndex())
+        app = Flask(__name__)
+        app.register_blueprint(phi.phi_bp)
+        app.register_blueprint(scheduling.scheduling_bp)
+        return app.test_client(), masker, appointments
+
+    def test_numeric_patient_name_is_coerced(self, client):
+        """Test that a non-string name is scheduled and masked instead of returning 500"""
+        client, masker, appointments = client
+        response = client.post('/schedule', json={'patient_name': 123, 'date': '2025-01-10', 'time': '10:00'})
+        assert response.status_code == 201
+        assert len(appointments) == 1
+        assert masker.mask('ref 123') == f'ref {PATIENT_TOKEN}'
+
+    @pytest.mark.parametrize('payload', [
+        [1],
+        {'patient_name': ['Jane'], 'date': '2025-01-10', 'time': '10:00'},
+        {'patient_name': 'Jane', 'patient_id': {'a': 1}, 'date': '2025-01-10', 'time': '10:00'},
+    ])
+    def test_invalid_schedule_is_rejected_before_storing(self, client, payload):
+        """Test that invalid names return 400 and leave no appointment behind"""
+        client, masker, appointments = client
+        assert client.post('/schedule', json=payload).status_code == 400
+        assert appointments == [] and len(masker) == 0
+
+    @pytest.mark.parametrize('payload', [
+        ['Jane'],
+        {'patients': [{'name': 'Jane Smith'}]},
+        {'patients': [{'id': 'PAT-1', 'name': 'Jane Smith'}], 'providers': [{'id': 'PROV-1'}]},
+        {'patients': {'id': 'PAT-1', 'name': 'Jane Smith'}},
+        {'remove_patients': 'PAT-1'},
+    ])
+    def test_invalid_roster_is_rejected_before_applying(self, client, payload):
+        """Test that a bad roster entry returns 400 without applying the rest"""
+        client, masker, _ = client
+        assert client.post('/phi/roster', json=payload).status_code == 400
+        assert len(masker) == 0
+
+    def test_roster_round_trip(self, client):
+        """Test adding and removing roster entries by id"""
+        client, masker, _ = client
+        client.post('/phi/roster', json={'patients': [{'id': 7, 'name': 'Jane Smith'}]})
+        response = client.post('/phi/mask', json={'message': 'Hi Jane Smith'})
+        assert response.get_json()['masked_message'] == f'Hi {PATIENT_TOKEN}'
+        client.post('/phi/roster', json={'remove_patients': [7]})
+        assert len(masker) == 0
+
+    @pytest.mark.parametrize('payload', [{}, {'message': 5}, {'messages': 'Hi Jane'}, {'messages': [None]}])
+    def test_invalid_mask_payload_is_rejected(self, client, payload):
+        """Test that /phi/mask needs a string or a list of strings"""
+        assert client[0].post('/phi/mask', json=payload).status_code == 400
@@ -0,0 +1,134 @@
+"""
+Tests for the recall cohort index and /recall/due
+"""
+import json
+import random
+import threading
+from datetime import date, timedelta
+
+import pytest
+from services.recall_cohort import RecallCohortIndex
+
+
+def appointment(patient_id, visit, practice_id='smile', **fields):
+    return {'patient_id': patient_id, 'patient_name': f"Patient {patient_id}", 'practice_id': practice_id,
+            'patient_phone': '+15125550100', 'date': visit, 'status': 'SCHEDULED', **fields}
+
+
+@pytest.fixture
+def index():
+    index = RecallCohortIndex(interval_days=182)
+    index.add_appointment(appointment('P1', '2025-01-10'))
+    index.add_appointment(appointment('P2', '2025-03-01'))
+    index.add_appointment(appointment('P3', '2025-06-01'))
+    return index
+
+
+class TestRecallCohortIndex:
+    """Test due-date ordering, cancellations and concurrent updates"""
+
+    def test_overdue_is_most_overdue_first(self, index):
+        """Test that the cohort is ordered by due date and honours the window"""
+        assert index.overdue('2025-09-01') == [('smile', 'P1'), ('smile', 'P2')]
+        assert index.overdue('2025-07-11') == [('smile', 'P1')]
+        assert index.overdue('2025-07-10') == []
+        assert index.overdue('2025-07-10', window_days=51) == [('smile', 'P1'), ('smile', 'P2')]
+
+    def test_due_between_is_inclusive(self, index):
+        """Test that both ends of the range are included"""
+        assert index.due_between('2025-07-11', '2025-08-30') == [('smile', 'P1'), ('smile', 'P2')]
+        assert index.due_between('2025-07-12', '2025-08-29') == []
+
+    def test_rebooking_moves_patient_out(self, index):
+        """Test that a newer visit replaces the old due date"""
+        index.add_appointment(appointment('P1', '2025-08-01'))
+        assert index.overdue('2025-09-01') == [('smile', 'P2')]
+
+    def test_cancelled_visit_does_not_count(self, index):
+        """Test that cancelling a rebooked visit puts the patient back in the cohort"""
+        rebooked = appointment('P1', '2025-08-01')
+        index.add_appointment(rebooked)
+        rebooked['status'] = 'CANCELLED'
+        index.update_appointment(rebooked)
+        assert index.overdue('2025-09-01') == [('smile', 'P1'), ('smile', 'P2')]
+        index.add_appointment(appointment('P4', '2025-01-01', status='CANCELLED'))
+        assert len(index) == 3
+
+    def test_payload_without_patient_id_carries_no_name(self):
+        """Test that unnamed patients get an opaque, stable id"""
+        index = RecallCohortIndex()
+        index.add_appointment(appointment('', '2025-01-10', patient_name='Jane Smith'))
+        index.add_appointment(appointment('', '2025-02-10', patient_name='jane smith '))
+        [[payload]] = index.reminder_batches('2025-12-01')
+        assert 'jane' not in json.dumps(payload).lower()
+        assert payload['patient_id'].startswith('ANON-')
+        assert payload['last_visit'] == '2025-02-10'
+
+    def test_load_matches_incremental(self):
+        """Test that bulk loading and one-by-one adds build the same index"""
+        rng = random.Random(0)
+        history = [
+            appointment(f"P{rng.randrange(200)}", (date(2024, 1, 1) + timedelta(days=rng.randrange(600))).isoformat(),
+                        practice_id=rng.choice(['a', 'b']), status=rng.choice(['SCHEDULED'] * 5 + ['CANCELLED']))
+            for _ in range(2000)
+        ]
+        bulk, incremental = RecallCohortIndex(), RecallCohortIndex()
+        bulk.load(history)
+        for appt in history:
+            incremental.add_appointment(appt)
+        assert bulk.overdue('2026-01-01') == incremental.overdue('2026-01-01')
+        assert list(bulk.reminder_batches('2026-01-01')) == list(incremental.reminder_batches('2026-01-01'))
+
+    def test_concurrent_adds_keep_index_consistent(self):
+        """Test that request threads cannot corrupt the sorted due list"""
+        index = RecallCohortIndex()
+
+        def feed(seed):
+            rng = random.Random(seed)
+            for _ in range(500):
+                visit = date(2025, 1, 1) + timedelta(days=rng.randrange(300))
+                index.add_appointment(appointment(f"P{rng.randrange(50)}", visit.isoformat()))
+
+        threads = [threading.Thread(target=feed, args=(seed,)) for seed in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert index._due == sorted((visit + index.interval, key) for key, (visit, _) in index._latest.items())
+
+    def test_batch_size_must_be_positive(self, index):
+        """Test that a non-positive batch size is rejected"""
+        with pytest.raises(ValueError):
+            list(index.reminder_batches('2025-09-01', batch_size=0))
+
+
+class TestRecallRoute:
+    """Test /recall/due parameters and output formats"""
+
+    @pytest.fixture
+    def client(self, monkeypatch, index):
+        from flask import Flask
+        from routes import recall
+
+        monkeypatch.setattr(recall, 'RECALL_INDEX', index)
+        app = Flask(__name__)
+        app.register_blueprint(recall.recall_bp)
+        return app.test_client()
+
+    def test_batches(self, client):
+        """Test that candidates are batched most overdue first"""
+        body = client.get('/recall/due?as_of=2025-09-01&batch_size=1').get_json()
+        assert body['total_candidates'] == 2
+        assert [batch[0]['patient_id'] for batch in body['batches']] == ['P1', 'P2']
+
+    def test_jsonl_for_run_sharded(self, client):
+        """Test that payloads can be exported one per line"""
+        response = client.get('/recall/due?as_of=2025-09-01&format=jsonl')
+        lines = response.get_data(as_text=True).splitlines()
+        assert response.mimetype == 'application/x-ndjson'
+        assert [json.loads(line)['appointment_id'] for line in lines] == ['RECALL-smile-P1', 'RECALL-smile-P2']
+
+    @pytest.mark.parametrize('query', ['as_of=yesterday', 'window_days=x', 'batch_size=0', 'batch_size=-5'])
+    def test_invalid_parameters(self, client, query):
+        """Test that bad parameters return 400"""
+        assert client.get(f"/recall/due?{query}").status_code == 400
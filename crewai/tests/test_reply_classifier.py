@@ -0,0 +1,173 @@
+"""
+Tests for the inbound reply classifier and webhook
+"""
+import threading
+
+import pytest
+from services.reply_classifier import (
+    CANCEL,
+    CONFIRM,
+    RESCHEDULE,
+    STOP,
+    UNKNOWN,
+    classify_text,
+    is_question,
+    normalize_text,
+    process_replies,
+)
+from services.reply_escalation import EscalationQueue
+
+
+def classify(body):
+    return classify_text(normalize_text(body), is_question(body))
+
+
+class TestClassifyText:
+    """Test keyword classification, negation and questions"""
+
+    @pytest.mark.parametrize('body, intent', [
+        ('CONFIRM', CONFIRM),
+        ('Yep I\'ll be there 👍', CONFIRM),
+        ('No problem, see you then', CONFIRM),
+        ('Please cancel my appointment', CANCEL),
+        ("I won't be there", CANCEL),
+        ('I need to move it to next week', RESCHEDULE),
+        ('yes but can we do a different time', RESCHEDULE),
+        ('please do not text me', STOP),
+    ])
+    def test_keywords(self, body, intent):
+        """Test that clear replies are classified without escalation"""
+        assert classify(body) == intent
+
+    @pytest.mark.parametrize('body', [
+        "I can't confirm yet",
+        'not sure I can come',
+        "I'm not ok with that time",
+        'Not really sure, let me check my calendar',
+    ])
+    def test_negated_confirm_is_not_a_confirmation(self, body):
+        """Test that a negated confirm keyword is left to the agent"""
+        assert classify(body) == UNKNOWN
+
+    @pytest.mark.parametrize('body, intent', [
+        ('I will stop by at 10, see you then', CONFIRM),
+        ("Please don't cancel, I'll be there", CONFIRM),
+        ("Yes, confirmed. Don't change anything", CONFIRM),
+        ('No need to reschedule, see you', CONFIRM),
+        ("I don't want to cancel", UNKNOWN),
+        ("Don't stop the reminders", UNKNOWN),
+    ])
+    def test_ordinary_phrases_do_not_trigger_destructive_intents(self, body, intent):
+        """Test that negated or incidental stop/cancel/change words are not acted on"""
+        assert classify(body) == intent
+
+    @pytest.mark.parametrize('body', ['STOP', 'please stop', 'Stop texting me', 'no more messages', 'Unsubscribe'])
+    def test_explicit_opt_out(self, body):
+        """Test that opting out needs a whole-message STOP or explicit phrasing"""
+        assert classify(body) == STOP
+
+    @pytest.mark.parametrize('body, intent', [
+        ('Is it ok to bring my kid?', UNKNOWN),
+        ('ok?', UNKNOWN),
+        ('Can we reschedule? 🙏', UNKNOWN),
+        ('Can I just cancel?', CANCEL),
+        ('How do I stop these?', STOP),
+    ])
+    def test_questions_are_unknown_unless_stop_or_cancel(self, body, intent):
+        """Test that questions are escalated instead of treated as answers"""
+        assert classify(body) == intent
+
+    def test_non_string_body_is_coerced(self):
+        """Test that numbers and missing bodies do not crash normalization"""
+        assert normalize_text(5) == '5'
+        assert normalize_text(None) == ''
+
+
+class TestProcessReplies:
+    """Test batched appointment updates and escalation records"""
+
+    def test_escalations_are_recorded(self, appointments):
+        """Test that escalated replies are kept on the appointment and in the summary"""
+        replies = [
+            {'from': 'whatsapp:+15125550100', 'body': 'Where do I park?'},
+            {'from': '+15125550101', 'body': 'could we do the afternoon'},
+            {'from': '+19999999999', 'body': 'who is this'},
+        ]
+        answers = {'could we do the afternoon': RESCHEDULE}
+        summary = process_replies(replies, appointments, lambda appt, entry: answers.get(entry['body']))
+
+        assert summary['escalated'] == 2
+        assert summary['unmatched'] == 1
+        assert summary['escalations'] == [{'appointment_id': 1, 'intent': UNKNOWN},
+                                          {'appointment_id': 2, 'intent': RESCHEDULE}]
+        assert appointments[0]['needs_review'] is True
+        assert appointments[0]['escalated_replies'] == [{'body': 'Where do I park?', 'intent': None}]
+        assert appointments[0]['status'] == 'SCHEDULED'
+        assert appointments[1]['status'] == 'RESCHEDULE_REQUESTED'
+        assert appointments[1]['needs_review'] is False
+
+
+class TestRepliesRoute:
+    """Test webhook input validation and background escalation"""
+
+    @pytest.fixture
+    def agent(self):
+        """Stand-in for the AI agent that only answers once released"""
+        state = {'answers': {}, 'released': threading.Event(), 'seen': []}
+
+        def classify(text):
+            state['seen'].append(text)
+            state['released'].wait(5)
+            return state['answers'].get(text)
+
+        return state, classify
+
+    @pytest.fixture
+    def client(self, monkeypatch, appointments, agent):
+        from flask import Flask
+        from routes import replies
+
+        monkeypatch.setattr(replies, 'APPOINTMENTS', appointments)
+        monkeypatch.setattr(replies, 'REPLY_ESCALATIONS', EscalationQueue(agent[1]))
+        app = Flask(__name__)
+        app.register_blueprint(replies.replies_bp)
+        return app.test_client()
+
+    def test_escalations_do_not_block_the_webhook(self, client, appointments, agent):
+        """Test that the webhook answers before the agent, which settles the reply later"""
+        from routes import replies
+
+        state, _ = agent
+        state['answers']['could we do the afternoon'] = RESCHEDULE
+        response = client.post('/replies', json={'from': '+15125550101', 'body': 'could we do the afternoon'})
+        assert response.get_json()['escalations'] == [{'appointment_id': 2, 'intent': UNKNOWN}]
+        assert appointments[1]['needs_review'] is True
+
+        state['released'].set()
+        replies.REPLY_ESCALATIONS.join()
+        assert appointments[1]['status'] == 'RESCHEDULE_REQUESTED'
+        assert appointments[1]['needs_review'] is False
+        assert appointments[1]['escalated_replies'] == [{'body': 'could we do the afternoon', 'intent': RESCHEDULE}]
+
+    def test_numeric_body_is_accepted(self, client, agent):
+        """Test that a non-string body is coerced rather than crashing"""
+        agent[0]['released'].set()
+        response = client.post('/replies', json={'from': '+15125550100', 'body': 5})
+        assert response.status_code == 200
+        assert response.get_json()['escalated'] == 1
+
+    @pytest.mark.parametrize('payload', [
+        [1, 2],
+        {'replies': ['yes']},
+        {'replies': {'from': '+15125550100'}},
+        {'from': '+15125550100', 'body': 'yes', 'appointment_id': [1]},
+    ])
+    def test_malformed_payloads_are_rejected(self, client, payload):
+        """Test that malformed JSON returns 400 instead of 500"""
+        assert client.post('/replies', json=payload).status_code == 400
+
+    def test_twilio_form_webhook(self, client, appointments):
+        """Test that Twilio form posts are classified and applied"""
+        response = client.post('/replies', data={'From': 'whatsapp:+15125550101', 'Body': 'C'})
+        assert response.get_json()['updated'] == 1
+        assert appointments[1]['status'] == 'CONFIRMED'